@@ -0,0 +1,139 @@
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+
+
+class BidCodec:
+    """
+    Encodes the complete bids of a domain as a single int.
+
+    The issues are sorted on name and the values of an issue keep the domain
+    order, a bid is then the mixed-radix number of its value indices, with
+    the number of values of every issue as radix. Codes run from 0 up to the
+    number of bids, so they can be used as dict keys, set members or array
+    indices instead of Bid objects. Build one codec per domain and reuse it.
+    """
+
+    def __init__(self, domain: Domain):
+        """
+        @param domain the domain of the bids
+        """
+        self._issues: List[str] = sorted(domain.getIssues())
+        self._values: List[List[Value]] = [
+            list(domain.getValues(issue)) for issue in self._issues
+        ]
+        self._index: List[Dict[Value, int]] = [{
+            value: i
+            for i, value in enumerate(values)
+        } for values in self._values]
+        # weight of every issue in the code, the last issue varies fastest
+        self._places: List[int] = [1] * len(self._issues)
+        for i in reversed(range(len(self._issues) - 1)):
+            self._places[i] = self._places[i + 1] * len(self._values[i + 1])
+        self._size = (self._places[0] * len(self._values[0])
+                      if self._issues else 1)
+
+    def getIssues(self) -> List[str]:
+        return self._issues
+
+    def getRadices(self) -> List[int]:
+        """
+        @return the number of values of every issue, in issue order
+        """
+        return [len(values) for values in self._values]
+
+    def getValues(self) -> List[List[Value]]:
+        """
+        @return the values of every issue, in issue order
+        """
+        return self._values
+
+    def getPlaces(self) -> List[int]:
+        """
+        @return the weight of every issue in the code, in issue order
+        """
+        return self._places
+
+    def size(self) -> int:
+        """
+        @return the number of bids in the domain, codes are below this
+        """
+        return self._size
+
+    def encode(self, bid: Bid) -> int:
+        """
+        @param bid a complete bid of the domain
+        @return the code of the bid
+        @throws ValueError if the bid misses an issue or has an unknown value
+        """
+        code = 0
+        for issue, index, place in zip(self._issues, self._index,
+                                       self._places):
+            position = index.get(bid.getValue(issue))  # type:ignore
+            if position == None:
+                raise ValueError(
+                    f"bid {bid} has no value of the domain for {issue}")
+            code += position * place
+        return code
+
+    def decode(self, code: int) -> Bid:
+        """
+        @param code a code returned by {@link #encode}
+        @return the bid with the code
+        """
+        return Bid({
+            issue: values[position]
+            for issue, values, position in zip(self._issues, self._values,
+                                               self.toIndices(code))
+        })
+
+    def toIndices(self, code: int) -> Tuple[int, ...]:
+        """
+        @param code a code returned by {@link #encode}
+        @return the value index of every issue of the coded bid
+        """
+        if not 0 <= code < self._size:
+            raise IndexError(f"bid code {code} out of range")
+        return tuple(code // place % len(values)
+                     for place, values in zip(self._places, self._values))
+
+    def compact(self, bid: Bid) -> "CompactBid":
+        """
+        @param bid a complete bid of the domain
+        @return the bid as a {@link CompactBid}
+        """
+        return CompactBid(self, self.encode(bid))
+
+
+class CompactBid:
+    """
+    A bid stored as its code in a {@link BidCodec}. Hashing and comparing
+    only looks at the code, so these are cheap set members and dict keys. Use
+    toBid to get the geniusweb Bid at the protocol boundary.
+    """
+
+    __slots__ = ("_codec", "_code")
+
+    def __init__(self, codec: BidCodec, code: int):
+        self._codec = codec
+        self._code = code
+
+    def getCode(self) -> int:
+        return self._code
+
+    def toBid(self) -> Bid:
+        return self._codec.decode(self._code)
+
+    def __eq__(self, other):
+        return (isinstance(other, CompactBid) and self._code == other._code
+                and self._codec is other._codec)
+
+    def __hash__(self):
+        return hash(self._code)
+
+    def __repr__(self):
+        return f"CompactBid({self._code})"
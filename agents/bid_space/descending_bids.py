@@ -0,0 +1,73 @@
+import heapq
+from decimal import Decimal
+from itertools import count
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from agents.bid_space.weighted_values import getWeightedValues
+
+
+class DescendingBids(Iterator[Bid]):
+    """
+    Iterates over all bids of a linear additive space from the best to the
+    worst, without enumerating the bid space.
+
+    The values of every issue are sorted on their weighted utility, so a bid
+    is a rank per issue and the best bid has rank 0 everywhere. A priority
+    queue holds the bids that can come next. Taking a bid adds the bids that
+    are one rank worse on one issue, only for issues at or after the issue
+    that was changed last, which reaches every bid exactly once. The queue
+    therefore holds at most issues times the number of bids taken so far.
+    """
+
+    def __init__(self, space: LinearAdditive):
+        """
+        @param space the utility space to walk
+        """
+        # the issues and the (weighted utility, value) of every issue, best
+        # first
+        self._issues, self._values = getWeightedValues(space)
+
+        # entries are (-utility, tie breaker, ranks, last changed issue)
+        self._queue: List[Tuple[Decimal, int, Tuple[int, ...], int]] = []
+        self._counter = count()
+        if self._issues and all(self._values):
+            start = tuple(0 for _ in self._issues)
+            self._push(start, 0)
+
+    def __iter__(self) -> "DescendingBids":
+        return self
+
+    def __next__(self) -> Bid:
+        if not self._queue:
+            raise StopIteration
+        _, _, ranks, last = heapq.heappop(self._queue)
+        for issue in range(last, len(self._issues)):
+            if ranks[issue] + 1 < len(self._values[issue]):
+                worse = ranks[:issue] + (ranks[issue] + 1, ) + ranks[issue + 1:]
+                self._push(worse, issue)
+        return Bid({
+            issue: self._values[i][rank][1]
+            for i, (issue, rank) in enumerate(zip(self._issues, ranks))
+        })
+
+    def peekUtility(self) -> Optional[Decimal]:
+        """
+        @return the utility of the bid that is returned next, or None if all
+                bids have been returned.
+        """
+        if not self._queue:
+            return None
+        return -self._queue[0][0]
+
+    def _push(self, ranks: Tuple[int, ...], last: int):
+        utility = sum(
+            (self._values[i][rank][0] for i, rank in enumerate(ranks)),
+            Decimal(0))
+        heapq.heappush(self._queue,
+                       (-utility, next(self._counter), ranks, last))
@@ -0,0 +1,108 @@
+from random import randrange
+from typing import List
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+
+from agents.bid_space.compact_bid import BidCodec
+from agents.bid_space.lru_cache import LRUCache
+
+
+class LazyBidSpace:
+    """
+    All bids of a domain, decoded from their index on demand.
+
+    Bid i is the bid with code i in a {@link BidCodec}, so looking up a bid
+    costs one step per issue and nothing is stored per bid. This also works
+    for domains with more bids than fit in memory. Get the space of a domain
+    with {@link #getBidSpace} so it is built only once.
+    """
+
+    def __init__(self, domain: Domain):
+        """
+        @param domain the domain of the bids
+        """
+        self._codec = BidCodec(domain)
+        self._radices = np.array(self._codec.getRadices(), dtype=np.int64)
+        # batch decoding needs every index to fit in an int64
+        self._places = None
+        if self.size() <= np.iinfo(np.int64).max:
+            self._places = np.array(self._codec.getPlaces(), dtype=np.int64)
+
+    def getCodec(self) -> BidCodec:
+        return self._codec
+
+    def size(self) -> int:
+        """
+        @return the number of bids, which may be larger than sys.maxsize
+        """
+        return self._codec.size()
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def get(self, index: int) -> Bid:
+        """
+        @param index the index of the bid, in [0, size)
+        @return the bid with the index
+        """
+        return self._codec.decode(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Bid, List[Bid]]:
+        if isinstance(index, slice):
+            return [self.get(i) for i in range(self.size())[index]]
+        if index < 0:
+            index += self.size()
+        return self.get(index)
+
+    def getRandomBid(self) -> Bid:
+        """
+        @return a bid drawn uniformly from all bids
+        """
+        return self.get(randrange(self.size()))
+
+    def decodeIndices(self, indices: Sequence[int]) -> np.ndarray:
+        """
+        Decode many bid indices at once.
+
+        @param indices the indices of the bids
+        @return array of shape (len(indices), issues) with the value index of
+                every issue of every bid, issues in the order of the codec
+        @throws ValueError if the domain is too large for int64 indices
+        """
+        if self._places is None:
+            raise ValueError("domain too large to decode indices in a batch")
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if indices.size and (indices.min() < 0
+                             or indices.max() >= self.size()):
+            raise IndexError("bid index out of range")
+        return indices[:, np.newaxis] // self._places % self._radices
+
+    def getBids(self, indices: Sequence[int]) -> List[Bid]:
+        """
+        @param indices the indices of the bids
+        @return the bids with the indices, decoded in one batch
+        """
+        issues = self._codec.getIssues()
+        values = self._codec.getValues()
+        return [
+            Bid({
+                issue: values[i][position]
+                for i, (issue, position) in enumerate(zip(issues, row))
+            }) for row in self.decodeIndices(indices).tolist()
+        ]
+
+
+_cache: LRUCache[LazyBidSpace] = LRUCache(maxsize=32)
+
+
+def getBidSpace(domain: Domain) -> LazyBidSpace:
+    """
+    @param domain the domain of the bids
+    @return the LazyBidSpace of the domain, shared by everyone in this
+            process that asks for an equal domain
+    """
+    return _cache.get(domain, lambda: LazyBidSpace(domain))
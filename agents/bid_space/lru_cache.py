@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import Hashable
+from typing import TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread safe, bounded least-recently-used cache.
+
+    A missing value is loaded outside the lock, so a slow load does not block
+    lookups of other keys. Two threads that miss the same key at once may
+    both load it, the last one is kept.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        @param maxsize the maximum number of values that are kept
+        """
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, load: Callable[[], V]) -> V:
+        """
+        @param key  the key of the value
+        @param load called without arguments to create the value when the key
+                    is not in the cache
+        @return the cached or newly loaded value of the key
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        value = load()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drops all values and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """
+        @return the number of hits and misses and the current and maximum
+                size of the cache
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._entries),
+            "maxsize": self._maxsize
+        }
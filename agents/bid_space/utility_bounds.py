@@ -0,0 +1,59 @@
+from decimal import Decimal
+from typing import Dict
+from typing import Tuple
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+
+def getMaxUtilityBid(space: LinearAdditive) -> Bid:
+    """
+    The utility of a linear additive space is a weighted sum of one utility
+    per issue, so the best bid takes the best value of every issue. This
+    looks at every value of every issue once instead of enumerating all bids.
+
+    @param space the utility space
+    @return a bid with the maximum utility of the space. Ties are broken by
+            the order of the values in the domain.
+    """
+    return _extremeBid(space, maximum=True)
+
+
+def getMinUtilityBid(space: LinearAdditive) -> Bid:
+    """
+    @param space the utility space
+    @return a bid with the minimum utility of the space, see
+            {@link #getMaxUtilityBid}
+    """
+    return _extremeBid(space, maximum=False)
+
+
+def getUtilityBounds(space: LinearAdditive) -> Tuple[Decimal, Decimal]:
+    """
+    @param space the utility space
+    @return the minimum and maximum utility of all bids in the space,
+            ignoring the reservation bid
+    """
+    return (space.getUtility(getMinUtilityBid(space)),
+            space.getUtility(getMaxUtilityBid(space)))
+
+
+def _extremeBid(space: LinearAdditive, maximum: bool) -> Bid:
+    domain = space.getDomain()
+    utilities = space.getUtilities()
+    issuevalues: Dict[str, Value] = {}
+    # weights are never negative, so the best value of an issue does not
+    # depend on its weight
+    for issue in sorted(domain.getIssues()):
+        best = None
+        bestutil = None
+        for value in domain.getValues(issue):
+            util = utilities[issue].getUtility(value)
+            if (bestutil == None or (maximum and util > bestutil)
+                    or (not maximum and util < bestutil)):
+                best = value
+                bestutil = util
+        if best != None:
+            issuevalues[issue] = best
+    return Bid(issuevalues)
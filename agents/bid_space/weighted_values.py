@@ -0,0 +1,33 @@
+from decimal import Decimal
+from typing import List
+from typing import Tuple
+
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+
+def getWeightedValues(
+    space: LinearAdditive
+) -> Tuple[List[str], List[List[Tuple[Decimal, Value]]]]:
+    """
+    The utility of a bid in a linear additive space is the sum of the
+    weighted utility of its value of every issue, so searches over the bid
+    space can work on these per-issue lists instead of on bids.
+
+    @param space the utility space
+    @return the issues sorted on name, and for every issue in that order the
+            (weighted utility, value) of all its values, best first. Values
+            with equal utility keep the domain order.
+    """
+    domain = space.getDomain()
+    utilities = space.getUtilities()
+    weights = space.getWeights()
+    issues = sorted(domain.getIssues())
+    values: List[List[Tuple[Decimal, Value]]] = []
+    for issue in issues:
+        weighted = [(weights[issue] * utilities[issue].getUtility(value),
+                     value) for value in domain.getValues(issue)]
+        # stable sort, values with equal utility keep the domain order
+        weighted.sort(key=lambda x: x[0], reverse=True)
+        values.append(weighted)
+    return issues, values
@@ -1,12 +1,10 @@
 import logging
-from random import randint
 from typing import cast
 
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -23,6 +21,9 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
     ProfileConnectionFactory, )
 from geniusweb.progress.ProgressRounds import ProgressRounds
 
+from agents.bid_space.lazy_bid_space import getBidSpace
+from agents.bid_space.utility_bounds import getMaxUtilityBid
+
 
 class CustomAgent(DefaultParty):
     """
@@ -34,6 +35,7 @@ class CustomAgent(DefaultParty):
         self.getReporter().log(logging.INFO, "party is initialized")
         self._profile = None
         self._last_received_bid: Bid = None
+        self._max_bid: Bid = None
 
     def notifyChange(self, info: Inform):
         """This is the entry point of all interaction with your agent after is has been initialised.
@@ -54,6 +56,7 @@ class CustomAgent(DefaultParty):
             # the profile contains the preferences of the agent over the domain
             self._profile = ProfileConnectionFactory.create(
                 info.getProfile().getURI(), self.getReporter())
+            self._max_bid = None
         # ActionDone is an action send by an opponent (an offer or an accept)
         elif isinstance(info, ActionDone):
             action: Action = cast(ActionDone, info).getAction()
@@ -143,9 +146,9 @@ class CustomAgent(DefaultParty):
         return profile.getUtility(bid) > 0.4 and progress > 0.8
 
     def _findBid(self, attempts=50) -> Bid:
-        # compose a list of all possible bids
+        # all possible bids, decoded on demand and shared between sessions
         domain = self._profile.getProfile().getDomain()
-        all_bids = AllBidsList(domain)
+        all_bids = getBidSpace(domain)
         profile, progress = self._getProfileAndProgress()
 
         if progress < 0.1:
@@ -153,24 +156,16 @@ class CustomAgent(DefaultParty):
 
         # take 50 attempts at finding a random bid that is acceptable to us
         for _ in range(attempts):
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
+            bid = all_bids.getRandomBid()
             if self._isGoodOutgoing(bid):
                 break
 
         return bid
 
     def _findMaxBid(self, attempts=50) -> Bid:
-        # compose a list of all possible bids
+        # the best bid of a linear additive profile is computed exactly, the
+        # attempts argument is only kept for compatibility
         profile, _ = self._getProfileAndProgress()
-        domain = profile.getDomain()
-        all_bids = AllBidsList(domain)
-
-        # take 50 attempts at finding a random bid that is acceptable to us
-        maxBid = all_bids.get(0)
-
-        for _ in range(attempts):
-            bid = all_bids.get(randint(1, all_bids.size() - 1))
-            maxBid = maxBid if (
-                profile.getUtility(maxBid) > profile.getUtility(bid)) else bid
-
-        return maxBid
+        if self._max_bid is None:
+            self._max_bid = getMaxUtilityBid(profile)
+        return self._max_bid
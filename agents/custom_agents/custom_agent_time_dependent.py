@@ -2,14 +2,12 @@ import logging
 import sys
 import traceback
 from decimal import Decimal
-from random import randint
 from random import random
-from time import sleep
-from time import time as clock
 from typing import cast
 from typing import Collection
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Set
 
 from geniusweb.actions.Accept import Accept
@@ -41,10 +39,11 @@ from geniusweb.profileconnection.ProfileInterface import ProfileInterface
 from geniusweb.progress.Progress import Progress
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from geniusweb.utils import val
-from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
 from tudelft_utilities_logging.Reporter import Reporter
 
+from agents.time_dependent_agent.clock import getClock
 from agents.time_dependent_agent.extended_util_space import ExtendedUtilSpace
+from agents.time_dependent_agent.extended_util_space import getExtendedUtilSpace
 
 
 class CustomAgent(DefaultParty):
@@ -96,6 +95,7 @@ class CustomAgent(DefaultParty):
         self._e: float = 1.2
         self._lastvotes: Votes = None  # type:ignore
         self._settings: Settings = None  # type:ignore
+        self._utilityGoals: Optional[List[float]] = None
         self.getReporter().log(logging.INFO, "party is initialized")
 
     # Override
@@ -112,6 +112,7 @@ class CustomAgent(DefaultParty):
                 self._settings = info
                 self._me = self._settings.getID()
                 self._progress = self._settings.getProgress()
+                self._utilityGoals = None
                 newe = self._settings.getParameters().get("e")
                 if newe != None:
                     if isinstance(newe, float):
@@ -232,7 +233,8 @@ class CustomAgent(DefaultParty):
         newutilspace = self._profileint.getProfile()
         if not newutilspace == self._utilspace:
             self._utilspace = cast(LinearAdditive, newutilspace)
-            self._extendedspace = ExtendedUtilSpace(self._utilspace)
+            self._extendedspace = getExtendedUtilSpace(self._utilspace)
+            self._utilityGoals = None
         return self._utilspace
 
     def _makeBid(self) -> Bid:
@@ -240,20 +242,62 @@ class CustomAgent(DefaultParty):
         @return next possible bid with current target utility, or null if no such
                 bid.
         """
-        time = self._progress.get(round(clock() * 1000))
+        utilityGoal = self._getCurrentUtilityGoal()
+        bid = self._extendedspace.getRandomBid(utilityGoal)
+        if bid == None:
+            # if we can't find good bid, get max util bid....
+            bid = self._extendedspace.getRandomBid(
+                self._extendedspace.getMax())
+        return bid
 
-        utilityGoal = self._getUtilityGoal(
+    def _getCurrentUtilityGoal(self) -> Decimal:
+        """
+        @return the utility goal for the current time. With a rounds deadline
+                the goal only depends on the round, so the goals of all rounds
+                are computed once with {@link #_getUtilityGoals} and looked up.
+        """
+        if isinstance(self._progress, ProgressRounds):
+            if self._utilityGoals == None:
+                self._utilityGoals = self._getUtilityGoals(
+                    self._progress.getDuration(),
+                    self.getE(),
+                    self._extendedspace.getMin(),
+                    self._extendedspace.getMax(),
+                )
+            round_ = min(self._progress.getCurrentRound(),
+                         len(self._utilityGoals) - 1)
+            return Decimal(self._utilityGoals[round_])
+
+        time = self._progress.get(round(getClock().time() * 1000))
+        return self._getUtilityGoal(
             time,
             self.getE(),
             self._extendedspace.getMin(),
             self._extendedspace.getMax(),
         )
-        options: ImmutableList[Bid] = self._extendedspace.getBids(utilityGoal)
-        if options.size() == 0:
-            # if we can't find good bid, get max util bid....
-            options = self._extendedspace.getBids(self._extendedspace.getMax())
-        # pick a random one.
-        return options.get(randint(0, options.size() - 1))
+
+    def _getUtilityGoals(self, rounds: int, e: float, minUtil: Decimal,
+                         maxUtil: Decimal) -> List[float]:
+        """
+        Float version of {@link #_getUtilityGoal} for every round of a rounds
+        deadline. The concession factor is rounded exactly like in the Decimal
+        version, so the goals equal its results up to float precision.
+
+        @param rounds  the number of rounds of the deadline
+        @param e       see {@link #_getUtilityGoal}
+        @param minUtil the minimum utility possible in our profile
+        @param maxUtil the maximum utility possible in our profile
+        @return the utility goal of round 0 up to and including rounds
+        """
+        low = float(minUtil)
+        high = float(maxUtil)
+        goals: List[float] = []
+        for r in range(rounds + 1):
+            ft1 = 1.0
+            if e != 0:
+                ft1 = float(round(Decimal(1 - pow(r / rounds, 1 / e)), 6))
+            goals.append(max(min(low + (high - low) * ft1, high), low))
+        return goals
 
     def _getUtilityGoal(self, t: float, e: float, minUtil: Decimal,
                         maxUtil: Decimal) -> Decimal:
@@ -305,22 +349,17 @@ class CustomAgent(DefaultParty):
             return False
         profile = cast(LinearAdditive, self._profileint.getProfile())
         # the profile MUST contain UtilitySpace
-        time = self._progress.get(round(clock() * 1000))
-        return profile.getUtility(bid) >= self._getUtilityGoal(
-            time,
-            self.getE(),
-            self._extendedspace.getMin(),
-            self._extendedspace.getMax(),
-        )
+        return profile.getUtility(bid) >= self._getCurrentUtilityGoal()
 
     def _delayResponse(self):  # throws InterruptedException
         """
         Do random delay of provided delay in seconds, randomized by factor in
-        [0.5, 1.5]. Does not delay if set to 0.
+        [0.5, 1.5]. Does not delay if set to 0. With a virtual clock the delay
+        is simulated and returns immediately.
 
         @throws InterruptedException
         """
         delay = self._settings.getParameters().getDouble(
             "delay", 0, 0, 10000000)
         if delay > 0:
-            sleep(delay * (0.5 + random()))
+            getClock().sleep(delay * (0.5 + random()))
@@ -0,0 +1,57 @@
+"""Index of all bids of a domain, sorted on their utility."""
+from bisect import bisect_left
+from bisect import bisect_right
+from random import randint
+from typing import List
+from typing import Optional
+
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+
+
+class SortedBidIndex:
+    """
+    All bids of a domain sorted on their utility for one profile.
+
+    Built once per session, after which the bids within a utility range are
+    found with two binary searches instead of a scan over all bids.
+    """
+
+    def __init__(self, profile: UtilitySpace):
+        self._allBids = AllBidsList(profile.getDomain())
+        utilities = [
+            float(profile.getUtility(self._allBids.get(i)))
+            for i in range(self._allBids.size())
+        ]
+        self._order: List[int] = sorted(range(len(utilities)),
+                                        key=utilities.__getitem__)
+        self._utilities: List[float] = [utilities[i] for i in self._order]
+
+    def count(self, low: float, high: float) -> int:
+        """Return the number of bids with a utility in [low, high]."""
+        return max(0, self._end(high) - self._start(low))
+
+    def getRandomBid(self, low: float, high: float) -> Optional[Bid]:
+        """Return a random bid with a utility in [low, high], if any."""
+        start, end = self._start(low), self._end(high)
+        if start >= end:
+            return None
+        return self._allBids.get(self._order[randint(start, end - 1)])
+
+    def getClosestBid(self, utility: float) -> Bid:
+        """Return the bid with the utility closest to the given one."""
+        position = bisect_left(self._utilities, utility)
+        candidates = [
+            x for x in (position - 1, position)
+            if 0 <= x < len(self._utilities)
+        ]
+        closest = min(candidates,
+                      key=lambda x: abs(self._utilities[x] - utility))
+        return self._allBids.get(self._order[closest])
+
+    def _start(self, low: float) -> int:
+        return bisect_left(self._utilities, low)
+
+    def _end(self, high: float) -> int:
+        return bisect_right(self._utilities, high)
@@ -0,0 +1,23 @@
+"""Source of the current time for PonPoko, replaceable by simulated time."""
+from time import time
+from typing import Callable
+
+_timeSource: Callable[[], float] = time
+
+
+def getTime() -> float:
+    """Return the current time in seconds since the epoch."""
+    return _timeSource()
+
+
+def setTimeSource(source: Callable[[], float]) -> Callable[[], float]:
+    """
+    Replace the time source of this process.
+
+    Runners that simulate time install their clock here for the duration of
+    a session and restore the returned previous source afterwards.
+    """
+    global _timeSource
+    previous = _timeSource
+    _timeSource = source
+    return previous
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Deque
+from typing import Dict
+from typing import Optional
+
+
+class StreamingOpponentClassifier:
+    """
+    Classify the opponent from the utilities of its offers.
+
+    The opponent is a conceder, hardliner or neutral, which is decided from a
+    stream of utilities in constant memory. Every offer is compared with the
+    previous one. An increase of our utility of more than epsilon_higher
+    counts as a concession, a change below epsilon_lower as a hardline move
+    and anything in between as neutral. Only the utility of the previous
+    offer, the move counts and the running mean of the deltas are kept. With
+    a window only the moves of the last window offers are counted, which
+    keeps a fixed-size queue of moves.
+    """
+
+    MOVES = ("conceder", "hardliner", "neutral")
+
+    def __init__(self,
+                 epsilon_higher: float,
+                 epsilon_lower: float,
+                 window: Optional[int] = None):
+        """
+        Create a classifier without any moves.
+
+        @param epsilon_higher minimal utility increase of a concession
+        @param epsilon_lower utility change below which a move is hardline
+        @param window number of recent moves to count, None counts all moves
+        """
+        self._epsilonHigher = epsilon_higher
+        self._epsilonLower = epsilon_lower
+        self._previous: Optional[float] = None
+        self._counts: Dict[str, int] = {move: 0 for move in self.MOVES}
+        self._moves = 0
+        self._meanDelta = 0.0
+        self._window: Optional[Deque[str]] = (None if window is None else
+                                              deque(maxlen=window))
+
+    def update(self, utility: float) -> Optional[str]:
+        """
+        Add the utility of the next offer of the opponent.
+
+        @param utility our utility of the offer
+        @return the class of the move, None for the first offer
+        """
+        previous, self._previous = self._previous, utility
+        if previous is None:
+            return None
+
+        delta = utility - previous
+        if delta > self._epsilonHigher:
+            move = "conceder"
+        elif delta < self._epsilonLower:
+            move = "hardliner"
+        else:
+            move = "neutral"
+
+        self._moves += 1
+        self._meanDelta += (delta - self._meanDelta) / self._moves
+        if self._window is not None:
+            if len(self._window) == self._window.maxlen:
+                self._counts[self._window[0]] -= 1
+            self._window.append(move)
+        self._counts[move] += 1
+        return move
+
+    def getClassification(self) -> str:
+        """The most frequent move, ties go to the first in MOVES."""
+        return max(self._counts, key=self._counts.get)  # type: ignore
+
+    def getCounts(self) -> Dict[str, int]:
+        """Number of moves of every class that are counted."""
+        return dict(self._counts)
+
+    def getMeanDelta(self) -> float:
+        """Mean utility change between consecutive offers."""
+        return self._meanDelta
@@ -9,6 +9,9 @@ from operator import sub
 from random import randint
 from random import sample
 from random import uniform
+from typing import Tuple
+
+import numpy as np
 
 
 class PatternGeneratorType(Enum):
@@ -29,14 +32,72 @@ class PatternGeneratorType(Enum):
 
 
 # === Pattern Generation Magic ===
-def _generate_value(a, b, op, trig):
+# numpy counterparts of the trigonometric functions, for Pattern.tabulate
+_NUMPY_TRIG = {sin: np.sin, cos: np.cos, tan: np.tan}
 
-    if op == sub:
-        return lambda t: 1.0 - a * t - abs(trig(b * t))
-    elif op == add:
-        return lambda t: 1.0 - a * t + abs(trig(b * t))
-    else:
-        return lambda t: 1.0 - op(a * t, abs(trig(b * t)))
+
+class _Bound:
+    """One side of a pattern: 1.0 - a * t (op) abs(trig(b * t))."""
+
+    __slots__ = ("_a", "_b", "_op", "_trig", "_np_trig")
+
+    def __init__(self, a, b, op, trig):
+        self._a = a
+        self._b = b
+        self._op = op
+        self._trig = trig
+        self._np_trig = _NUMPY_TRIG[trig]
+
+    def value(self, t: float) -> float:
+        """Evaluate the bound at a single time point."""
+        if self._op is sub:
+            return 1.0 - self._a * t - abs(self._trig(self._b * t))
+        elif self._op is add:
+            return 1.0 - self._a * t + abs(self._trig(self._b * t))
+        return 1.0 - self._op(self._a * t, abs(self._trig(self._b * t)))
+
+    def values(self, t: np.ndarray) -> np.ndarray:
+        """Evaluate the bound at an array of time points."""
+        trig = np.abs(self._np_trig(self._b * t))
+        if self._op is sub:
+            return 1.0 - self._a * t - trig
+        elif self._op is add:
+            return 1.0 - self._a * t + trig
+        return 1.0 - self._op(self._a * t, trig)
+
+    def __repr__(self):
+        """Show the formula of the bound."""
+        return (f"1.0 - {self._a}t {self._op.__name__} "
+                f"abs({self._trig.__name__}({self._b}t))")
+
+
+class Pattern:
+    """
+    A precompiled pattern, called with (t, iftime) it returns (high, low).
+
+    The bounds are built once, so evaluating the pattern does not create any
+    functions. The patterns do not depend on iftime.
+    """
+
+    __slots__ = ("_high", "_low")
+
+    def __init__(self, high: _Bound, low: _Bound):
+        """Create a pattern from its upper and lower bound."""
+        self._high = high
+        self._low = low
+
+    def __call__(self, t: float, iftime: float) -> Tuple[float, float]:
+        """Evaluate the pattern at a single time point."""
+        return (self._high.value(t), self._low.value(t))
+
+    def tabulate(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Evaluate the pattern at every time point in one go."""
+        times = np.asarray(times, dtype=np.float64)
+        return (self._high.values(times), self._low.values(times))
+
+    def __repr__(self):
+        """Show the formulas of both bounds."""
+        return f"Pattern({self._high!r}, {self._low!r})"
 
 
 def _generate_pattern(one,
@@ -44,20 +105,15 @@ def _generate_pattern(one,
                       op_one=sub,
                       op_two=sub,
                       trig_one=sin,
-                      trig_two=sin):
+                      trig_two=sin) -> Pattern:
     """Generates a pattern based on the algoriths described in the ANAC 2017 paper."""
     a, b = one
     c, d = two
-
-    def inner(t: float, iftime: float):
-        v = _generate_value(a, b, op_one, trig_one)(t)
-        w = _generate_value(c, d, op_two, trig_two)(t)
-        return (v, w)
-
-    return inner
+    return Pattern(_Bound(a, b, op_one, trig_one),
+                   _Bound(c, d, op_two, trig_two))
 
 
-def _mutate_pattern(one, two):
+def _mutate_pattern(one, two) -> Pattern:
     operators = [mul, sub, add, pow]
     trigops = [sin, cos, tan]
 
@@ -66,13 +122,6 @@ def _mutate_pattern(one, two):
     trig_one = sample(trigops, 1)[0]
     trig_two = sample(trigops, 1)[0]
 
-    print(
-        f"1.0 - {one[0]}t {op_one.__name__} abs({trig_one.__name__}({one[1]}t))"
-    )
-    print(
-        f"1.0 - {two[0]}t {op_two.__name__} abs({trig_two.__name__}({two[1]}t))"
-    )
-
     return _generate_pattern(one, two, op_one, op_two, trig_one, trig_two)
 
 
@@ -91,6 +140,13 @@ hardliner_pattern_1 = _generate_pattern((0.01, 0), (0.01, 25))
 
 conceder_pattern_1 = _generate_pattern((0.25, 0), (0.25, 25))
 
+# the patterns above are the only ones that are reused, generated patterns
+# are new objects every time
+fixed_patterns = frozenset([
+    pattern_1, pattern_2, pattern_3, pattern_5, hardliner_pattern_1,
+    conceder_pattern_1
+])
+
 
 def pattern_4(t: float, iftime: float):
     """Applies the fourth pattern."""
@@ -133,7 +189,6 @@ class Patterns:
         elif self._type == PatternGeneratorType.Random:
             one = (uniform(0.01, 0.15), randint(0, 20))
             two = (uniform(0.01, 0.35), randint(0, 80))
-            print(one, two)
             return _generate_pattern(one, two)
         elif self._type == PatternGeneratorType.Mutation:
             one = (uniform(0.01, 0.15), randint(0, 20))
@@ -1,19 +1,20 @@
 import logging
+from collections import OrderedDict
 from decimal import Decimal
-from math import isclose
-from random import randint
-from time import time_ns
 from typing import cast
 from typing import Dict
+from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
 
+import numpy as np
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.LearningDone import LearningDone
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.Vote import Vote
 from geniusweb.actions.Votes import Votes
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -30,6 +31,11 @@ from geniusweb.progress.ProgressRounds import ProgressRounds
 from geniusweb.progress.ProgressTime import ProgressTime
 from geniusweb.utils import val
 
+from .bid_index import SortedBidIndex
+from .clock import getTime
+from .opponent_model import StreamingOpponentClassifier
+from .patterns import fixed_patterns
+from .patterns import Pattern
 from .patterns import PatternGeneratorType
 from .patterns import Patterns
 
@@ -52,15 +58,17 @@ class PonPokoParty(DefaultParty):
         self._utility_generator = Patterns(PatternGeneratorType.Opponent)
         self._utility_func = next(self._utility_generator)
         self._PATTERN_CHANGE_DELAY = -1
-        self._receivedBids = []
         self._OPPONENT_EPSILON_HIGHER = 0.25
         self._OPPONENT_EPSILON_LOWER = 0.1
-        self._moveCounts: Dict[str, int] = {
-            "conceder": 0,
-            "hardliner": 0,
-            "neutral": 0
-        }
+        self._OPPONENT_WINDOW: Optional[int] = None
+        self._opponentClassifier = StreamingOpponentClassifier(
+            self._OPPONENT_EPSILON_HIGHER, self._OPPONENT_EPSILON_LOWER)
         self._opponentModeled = False
+        self._bidIndex: Optional[SortedBidIndex] = None
+        self._utilspace = None
+        self._UTILITY_CACHE_SIZE = 1024
+        self._utilityCache: OrderedDict[Bid, Decimal] = OrderedDict()
+        self._schedules: Dict[Pattern, List[Tuple[float, float]]] = {}
 
     # Override
     def notifyChange(self, info: Inform):
@@ -72,13 +80,20 @@ class PonPokoParty(DefaultParty):
 
             self._processParameters()
             self._pattern_change_count = self._PATTERN_CHANGE_DELAY
+            self._opponentClassifier = StreamingOpponentClassifier(
+                self._OPPONENT_EPSILON_HIGHER, self._OPPONENT_EPSILON_LOWER,
+                self._OPPONENT_WINDOW)
 
             if "Learn" == self._protocol:
                 self.getConnection().send(LearningDone(self._me))  #type:ignore
             else:
                 self._profile = ProfileConnectionFactory.create(
                     info.getProfile().getURI(), self.getReporter())
+                self._utilspace = self._profile.getProfile()
             self._opponentModeled = False
+            self._bidIndex = None
+            self._utilityCache.clear()
+            self._schedules.clear()
 
         elif isinstance(info, ActionDone):
             action: Action = cast(ActionDone, info).getAction()
@@ -150,73 +165,57 @@ class PonPokoParty(DefaultParty):
         self.getConnection().send(action)
 
     def _isGood(self, bid: Bid) -> bool:
-        high, low = self._utility_func(self._getTimeFraction(), 0.0)
+        high, low = self._getUtilityRange(0.0)
 
         if bid is None:
             return False
-        profile = self._profile.getProfile()
-        if isinstance(profile, UtilitySpace):
-            return profile.getUtility(bid) >= low and profile.getUtility(
-                bid) <= high
+        if isinstance(self._utilspace, UtilitySpace):
+            utility = self._getUtility(bid)
+            return utility >= low and utility <= high
         raise Exception("Can not handle this type of profile")
 
+    def _getUtility(self, bid: Bid) -> Decimal:
+        """Return the utility of a bid, remembering recently evaluated bids."""
+        utility = self._utilityCache.get(bid)
+        if utility is None:
+            utility = self._utilspace.getUtility(bid)
+            self._utilityCache[bid] = utility
+            if len(self._utilityCache) > self._UTILITY_CACHE_SIZE:
+                self._utilityCache.popitem(last=False)
+        else:
+            self._utilityCache.move_to_end(bid)
+        return utility
+
     def _getBid(self):
-        allBids = AllBidsList(self._profile.getProfile().getDomain())
-        candidate_found = False
         if ((self._OPPONENT_EPSILON_HIGHER != -1
              or self._OPPONENT_EPSILON_LOWER != -1) and
                 self._utility_generator._type == PatternGeneratorType.Opponent
                 and self._getTimeFraction() >= 0.3):
-            self._utility_generator._opponent = max(self._moveCounts,
-                                                    key=self._moveCounts.get)
+            self._utility_generator._opponent = (
+                self._opponentClassifier.getClassification())
             self._utility_func = next(self._utility_generator)
 
-        high, low = self._utility_func(self._getTimeFraction(), 1.0)
+        high, low = self._getUtilityRange(1.0)
         self.getReporter().log(logging.INFO, f"Utility range [{low}, {high}]")
 
-        median = (high + low) / 2
-        close_to_median = []
-
-        for _attempt in range(allBids.size()):
-            bid = allBids.get(_attempt)
-
-            # Update bids close to median utility
-            current_bid_diff = abs(self._profile.getProfile().getUtility(bid)
-                                   - Decimal(median))
-            if isclose(current_bid_diff,
-                       0,
-                       abs_tol=self._FALLBACK_BID_UTIL_RANGE):
-                close_to_median.append(bid)
-
-            if self._isGood(bid):
-                candidate_found = True
-                break
-
-        if not candidate_found:
-            try:
-                bid = close_to_median[randint(0, len(close_to_median) - 1)]
-            except ValueError:
-                pass
+        if self._bidIndex is None:
+            self._bidIndex = SortedBidIndex(self._utilspace)
+
+        bid = self._bidIndex.getRandomBid(low, high)
+        if bid is None:
+            # Fall back to a bid close to the median utility
+            median = (high + low) / 2
+            bid = self._bidIndex.getRandomBid(
+                median - self._FALLBACK_BID_UTIL_RANGE,
+                median + self._FALLBACK_BID_UTIL_RANGE)
+        if bid is None:
+            bid = self._bidIndex.getClosestBid((high + low) / 2)
         return bid
 
     def _updateMoves(self):
-
-        def _util(bid):
-            return self._profile.getProfile().getUtility(bid)
-
-        if len(self._receivedBids) == 0:
-            self._receivedBids.append(self._lastReceivedBid)
-            return
-
-        self._receivedBids.append(self._lastReceivedBid)
-        if (_util(self._lastReceivedBid) - _util(
-                self._receivedBids[-1])) > self._OPPONENT_EPSILON_HIGHER:
-            self._moveCounts["conceder"] += 1
-        elif (_util(self._lastReceivedBid)
-              - _util(self._receivedBids[-1])) < self._OPPONENT_EPSILON_LOWER:
-            self._moveCounts["hardliner"] += 1
-        else:
-            self._moveCounts["neutral"] += 1
+        if self._lastReceivedBid is not None:
+            self._opponentClassifier.update(
+                float(self._getUtility(self._lastReceivedBid)))
 
     def _vote(self, voting: Voting) -> Votes:
         """
@@ -235,6 +234,29 @@ class PonPokoParty(DefaultParty):
         ])
         return Votes(self._me, votes)
 
+    def _getUtilityRange(self, iftime: float) -> Tuple[float, float]:
+        """
+        Return the (high, low) utility range of the current pattern.
+
+        With a rounds deadline the fixed patterns are tabulated for every
+        round the first time they are used in a session, after which a turn
+        only looks up its round. Generated patterns are only used until the
+        next pattern change, so they are evaluated directly.
+        """
+        if not (isinstance(self._progress, ProgressRounds)
+                and self._utility_func in fixed_patterns):
+            return self._utility_func(self._getTimeFraction(), iftime)
+
+        schedule = self._schedules.get(self._utility_func)
+        if schedule is None:
+            duration = self._progress.getDuration()
+            high, low = self._utility_func.tabulate(
+                np.arange(duration + 1) / duration)
+            schedule = list(zip(high.tolist(), low.tolist()))
+            self._schedules[self._utility_func] = schedule
+        return schedule[min(self._progress.getCurrentRound(),
+                            len(schedule) - 1)]
+
     def _getTimeFraction(self) -> float:
         """Calculate time value as fraction of negotiation time elapsed."""
         elapsed_time = 0
@@ -242,7 +264,7 @@ class PonPokoParty(DefaultParty):
             elapsed_time = self._progress.getCurrentRound(
             ) / self._progress.getDuration()
         elif isinstance(self._progress, ProgressTime):
-            elapsed_time = self._progress.get(time_ns() // 1e6)
+            elapsed_time = self._progress.get(round(getTime() * 1000))
         return elapsed_time
 
     def _processParameters(self):
@@ -281,3 +303,10 @@ class PonPokoParty(DefaultParty):
                 logging.INFO,
                 f"Opponent epsilon upper bound set to {self._OPPONENT_EPSILON_HIGHER}"
             )
+        if self._settings.getParameters().containsKey("opponentWindow"):
+            window = int(self._settings.getParameters().get("opponentWindow"))
+            self._OPPONENT_WINDOW = window if window > 0 else None
+            self.getReporter().log(
+                logging.INFO,
+                f"Opponent classification window set to {self._OPPONENT_WINDOW}"
+            )
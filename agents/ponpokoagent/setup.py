@@ -9,6 +9,7 @@ setup(
     author='V.D. van de Beek',
     packages=['ponpoko'],
     install_requires=[
-        "geniusweb@https://tracinsy.ewi.tudelft.nl/pubtrac/GeniusWebPython/export/82/geniuswebcore/dist/geniusweb-1.1.4.tar.gz"
+        "geniusweb@https://tracinsy.ewi.tudelft.nl/pubtrac/GeniusWebPython/export/82/geniuswebcore/dist/geniusweb-1.1.4.tar.gz",
+        "numpy"
     ],
     py_modules=['party'])
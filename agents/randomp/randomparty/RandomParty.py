@@ -1,6 +1,8 @@
 import logging
 from random import randint
 from typing import cast
+from typing import List
+from typing import Optional
 from typing import Set
 
 from geniusweb.actions.Accept import Accept
@@ -18,7 +20,6 @@ from geniusweb.inform.Settings import Settings
 from geniusweb.inform.Voting import Voting
 from geniusweb.inform.YourTurn import YourTurn
 from geniusweb.issuevalue.Bid import Bid
-from geniusweb.issuevalue.Domain import Domain
 from geniusweb.party.Capabilities import Capabilities
 from geniusweb.party.DefaultParty import DefaultParty
 from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
@@ -35,6 +36,8 @@ class RandomParty(DefaultParty):
         self.getReporter().log(logging.INFO, "party is initialized")
         self._profile = None
         self._lastReceivedBid: Bid = None
+        self._allBids: Optional[AllBidsList] = None
+        self._goodBids: Optional[List[int]] = None
 
     # Override
     def notifyChange(self, info: Inform):
@@ -48,6 +51,8 @@ class RandomParty(DefaultParty):
             else:
                 self._profile = ProfileConnectionFactory.create(
                     info.getProfile().getURI(), self.getReporter())
+            self._allBids = None
+            self._goodBids = None
         elif isinstance(info, ActionDone):
             action: Action = cast(ActionDone, info).getAction()
             if isinstance(action, Offer):
@@ -93,12 +98,7 @@ class RandomParty(DefaultParty):
         if self._isGood(self._lastReceivedBid):
             action = Accept(self._me, self._lastReceivedBid)
         else:
-            for _attempt in range(20):
-                bid = self._getRandomBid(
-                    self._profile.getProfile().getDomain())
-                if self._isGood(bid):
-                    break
-            action = Offer(self._me, bid)
+            action = Offer(self._me, self._getRandomGoodBid())
         self.getConnection().send(action)
 
     def _isGood(self, bid: Bid) -> bool:
@@ -109,9 +109,22 @@ class RandomParty(DefaultParty):
             return profile.getUtility(bid) > 0.7
         raise Exception("Can not handle this type of profile")
 
-    def _getRandomBid(self, domain: Domain) -> Bid:
-        allBids = AllBidsList(domain)
-        return allBids.get(randint(0, allBids.size() - 1))
+    def _getRandomGoodBid(self) -> Bid:
+        """
+        @return a bid drawn uniformly from the good bids, or from all bids if
+                there are no good bids.
+        """
+        if self._goodBids == None:
+            # index of every good bid, computed once per session
+            self._allBids = AllBidsList(self._profile.getProfile().getDomain())
+            self._goodBids = [
+                i for i in range(self._allBids.size())
+                if self._isGood(self._allBids.get(i))
+            ]
+        if len(self._goodBids) == 0:
+            return self._allBids.get(randint(0, self._allBids.size() - 1))
+        index = randint(0, len(self._goodBids) - 1)
+        return self._allBids.get(self._goodBids[index])
 
     def _vote(self, voting: Voting) -> Votes:
         """
@@ -1,12 +1,10 @@
 import logging
-from random import randint
 from typing import cast
 
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -23,6 +21,8 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
     ProfileConnectionFactory, )
 from geniusweb.progress.ProgressRounds import ProgressRounds
 
+from agents.bid_space.lazy_bid_space import getBidSpace
+
 
 class TemplateAgent(DefaultParty):
     """
@@ -129,13 +129,13 @@ class TemplateAgent(DefaultParty):
         return profile.getUtility(bid) > 0.6 and progress > 0.8
 
     def _findBid(self) -> Bid:
-        # compose a list of all possible bids
+        # all possible bids, decoded on demand and shared between sessions
         domain = self._profile.getProfile().getDomain()
-        all_bids = AllBidsList(domain)
+        all_bids = getBidSpace(domain)
 
         # take 50 attempts at finding a random bid that is acceptable to us
         for _ in range(50):
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
+            bid = all_bids.getRandomBid()
             if self._isGood(bid):
                 break
         return bid
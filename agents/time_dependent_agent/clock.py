@@ -0,0 +1,89 @@
+from abc import ABC
+from abc import abstractmethod
+from time import sleep
+from time import time
+from typing import Optional
+
+
+class Clock(ABC):
+    """
+    Source of the current time for parties. Parties read the time and wait
+    through the clock returned by {@link #getClock}, so a runner can replace
+    wall time by simulated time.
+    """
+
+    @abstractmethod
+    def time(self) -> float:
+        """
+        @return the current time in seconds since the epoch
+        """
+
+    @abstractmethod
+    def sleep(self, seconds: float):
+        """
+        Wait for the given number of seconds.
+        """
+
+
+class WallClock(Clock):
+    """The real time, this is the default clock."""
+
+    def time(self) -> float:
+        return time()
+
+    def sleep(self, seconds: float):
+        sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Simulated time that only moves when it is advanced. Sleeping advances the
+    clock instantly instead of waiting, so delays and time deadlines of a
+    session cost no wall time.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        @param start the initial time in seconds since the epoch, the current
+                     wall time if not given.
+        """
+        self._now = time() if start is None else start
+
+    def time(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        """
+        Move the clock forward.
+
+        @param seconds the number of seconds to move, ignored if negative
+        """
+        if seconds > 0:
+            self._now += seconds
+
+
+_clock: Clock = WallClock()
+
+
+def getClock() -> Clock:
+    """
+    @return the clock of this process
+    """
+    return _clock
+
+
+def setClock(clock: Clock) -> Clock:
+    """
+    Replace the clock of this process, sessions that run in the same process
+    all share it.
+
+    @param clock the new clock
+    @return the previous clock, to restore it afterwards
+    """
+    global _clock
+    previous = _clock
+    _clock = clock
+    return previous
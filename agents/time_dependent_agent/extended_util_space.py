@@ -1,14 +1,26 @@
+import hashlib
+import json
+from bisect import bisect_left
+from bisect import bisect_right
 from decimal import Decimal
+from random import randint
 from typing import List
+from typing import Optional
 
+from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.bidspace.BidsWithUtility import BidsWithUtility
 from geniusweb.bidspace.Interval import Interval
 from geniusweb.bidspace.IssueInfo import IssueInfo
 from geniusweb.issuevalue.Bid import Bid
 from geniusweb.issuevalue.Value import Value
 from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.utils import val
+from pyson.ObjectMapper import ObjectMapper
 from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
 
+from agents.bid_space.lru_cache import LRUCache
+from agents.time_dependent_agent.interval_bids import IntervalBids
+
 
 class ExtendedUtilSpace:
     """
@@ -16,24 +28,32 @@ class ExtendedUtilSpace:
     class may change in the future, use at your own risk.
     """
 
+    # domains with more bids are searched by branch and bound instead of
+    # sorting all bids
+    SORTED_BIDS_LIMIT = 100000
+
     def __init__(self, space: LinearAdditive):
         self._utilspace = space
         self._bidutils = BidsWithUtility.create(self._utilspace)
+        self._intervals = IntervalBids(self._utilspace)
         self._computeMinMax()
         self._tolerance = self._computeTolerance()
+        # all bids sorted on utility, built on the first lookup
+        self._allBids: Optional[AllBidsList] = None
+        self._order: List[int] = []
+        self._utilities: List[Decimal] = []
 
     def _computeMinMax(self):
         """
         Computes the fields minutil and maxUtil.
         <p>
-        TODO this is simplistic, very expensive method and may cause us to run
-        out of time on large domains.
+        The bounds are the sums of the worst and best weighted utility of every
+        issue, which does not depend on the size of the domain.
         <p>
-        Assumes that utilspace and bidutils have been set properly.
+        Assumes that utilspace and intervals have been set properly.
         """
-        range = self._bidutils.getRange()
-        self._minUtil = range.getMin()
-        self._maxUtil = range.getMax()
+        self._minUtil = self._intervals.getMin()
+        self._maxUtil = self._intervals.getMax()
 
         rvbid = self._utilspace.getReservationBid()
         if rvbid != None:
@@ -77,3 +97,98 @@ class ExtendedUtilSpace:
         """
         return self._bidutils.getBids(
             Interval(utilityGoal - self._tolerance, utilityGoal))
+
+    def getBidCount(self, utilityGoal: Decimal) -> int:
+        """
+        @param utilityGoal the requested utility
+        @return the number of bids with utility inside
+                [utilitygoal-{@link #tolerance}, utilitygoal]. Domains larger
+                than SORTED_BIDS_LIMIT are counted on rounded utilities by
+                {@link IntervalBids}.
+        """
+        if self._intervals.size() > self.SORTED_BIDS_LIMIT:
+            return self._intervals.count(utilityGoal - self._tolerance,
+                                         utilityGoal)
+        start, end = self._findRange(utilityGoal)
+        return max(0, end - start)
+
+    def getRandomBid(self, utilityGoal: Decimal) -> Optional[Bid]:
+        """
+        Like picking a random element of {@link #getBids}, but with two binary
+        searches on the sorted bids instead of building the list. Domains
+        larger than SORTED_BIDS_LIMIT are searched with {@link IntervalBids},
+        which may also return None when the bids of the interval are rare.
+
+        @param utilityGoal the requested utility
+        @return a random bid with utility inside
+                [utilitygoal-{@link #tolerance}, utilitygoal], or None if there
+                is no such bid.
+        """
+        if self._intervals.size() > self.SORTED_BIDS_LIMIT:
+            return self._intervals.getRandomBid(
+                utilityGoal - self._tolerance, utilityGoal)
+        start, end = self._findRange(utilityGoal)
+        if start >= end:
+            return None
+        return val(self._allBids).get(self._order[randint(start, end - 1)])
+
+    def _findRange(self, utilityGoal: Decimal):
+        """
+        @return the start and end position in the sorted bids of the bids
+                inside [utilitygoal-{@link #tolerance}, utilitygoal]
+        """
+        if self._allBids is None:
+            self._sortBids()
+        return (bisect_left(self._utilities, utilityGoal - self._tolerance),
+                bisect_right(self._utilities, utilityGoal))
+
+    def _sortBids(self):
+        allBids = AllBidsList(self._utilspace.getDomain())
+        utilities = [
+            self._utilspace.getUtility(allBids.get(i))
+            for i in range(allBids.size())
+        ]
+        self._order = sorted(range(len(utilities)),
+                             key=utilities.__getitem__)
+        self._utilities = [utilities[i] for i in self._order]
+        self._allBids = allBids
+
+
+class _ExtendedUtilSpaceCache:
+    """
+    Process-wide LRU cache of ExtendedUtilSpace instances, keyed by a hash of
+    the serialised profile. Parties that are created for every session on the
+    same profile share one instance instead of building a new one each time.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries: LRUCache[ExtendedUtilSpace] = LRUCache(maxsize)
+        self._mapper = ObjectMapper()
+
+    def get(self, space: LinearAdditive) -> ExtendedUtilSpace:
+        return self._entries.get(self._hash(space),
+                                 lambda: ExtendedUtilSpace(space))
+
+    def clear(self):
+        self._entries.clear()
+
+    def _hash(self, space: LinearAdditive) -> str:
+        content = json.dumps(self._mapper.toJson(space), sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+_cache = _ExtendedUtilSpaceCache(maxsize=32)
+
+
+def getExtendedUtilSpace(space: LinearAdditive) -> ExtendedUtilSpace:
+    """
+    @param space the utility space of the party
+    @return the ExtendedUtilSpace of the space, shared with earlier sessions
+            on a profile with the same contents.
+    """
+    return _cache.get(space)
+
+
+def clearExtendedUtilSpaceCache():
+    """Drops all cached ExtendedUtilSpace instances."""
+    _cache.clear()
@@ -0,0 +1,218 @@
+from decimal import Decimal
+from decimal import ROUND_CEILING
+from decimal import ROUND_FLOOR
+from random import randint
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from agents.bid_space.weighted_values import getWeightedValues
+
+
+class IntervalBids:
+    """
+    Finds the bids of a linear additive space with a utility inside an
+    interval, without enumerating the bid space.
+
+    The values of every issue are sorted on their weighted utility. The
+    minimum and maximum utility are the sums of the worst and best weighted
+    utility of every issue.
+    <p>
+    Counting and sampling work, like BidsWithUtility, on the weighted
+    utilities rounded to precision digits. For every issue a table holds the
+    number of completions of the issues from there onwards per rounded
+    utility, so their cost depends on the number of issues and values and not
+    on the number of bids in the interval. Sampled bids are checked against
+    their exact utility.
+    <p>
+    Enumerating the bids is done by branch and bound on the exact utilities:
+    a partial bid is pruned when even the best or worst completion of the
+    remaining issues cannot reach the interval.
+    """
+
+    # number of draws getRandomBid makes before it gives up
+    SAMPLE_TRIES = 100
+
+    def __init__(self, space: LinearAdditive, precision: int = 5):
+        """
+        @param space     the utility space to query
+        @param precision the number of digits the weighted utilities are
+                         rounded to when counting and sampling. The tables
+                         hold about 10^precision entries per issue.
+        """
+        # the issues and the (weighted utility, value) of every issue, best
+        # first
+        self._issues, self._values = getWeightedValues(space)
+        self._precision = precision
+
+        # best and worst utility and number of completions of the issues
+        # from an index onwards
+        issues = len(self._issues)
+        self._maxRest: List[Decimal] = [Decimal(0)] * (issues + 1)
+        self._minRest: List[Decimal] = [Decimal(0)] * (issues + 1)
+        self._sizes: List[int] = [1] * (issues + 1)
+        for i in reversed(range(issues)):
+            values = self._values[i]
+            self._sizes[i] = self._sizes[i + 1] * len(values)
+            if values:
+                self._maxRest[i] = self._maxRest[i + 1] + values[0][0]
+                self._minRest[i] = self._minRest[i + 1] + values[-1][0]
+
+        # rounded utility tables, built on the first count or sample
+        self._units: List[List[int]] = []
+        self._offsets: List[int] = []
+        self._tables: List[np.ndarray] = []
+
+    def getMin(self) -> Decimal:
+        """
+        @return the minimum utility of all bids
+        """
+        return self._minRest[0]
+
+    def getMax(self) -> Decimal:
+        """
+        @return the maximum utility of all bids
+        """
+        return self._maxRest[0]
+
+    def size(self) -> int:
+        """
+        @return the number of bids in the space
+        """
+        return self._sizes[0]
+
+    def count(self, low: Decimal, high: Decimal) -> int:
+        """
+        @return the number of bids of which the sum of the rounded weighted
+                utilities is inside [low, high]
+        """
+        return self._countRest(0, self._toUnits(low, ROUND_CEILING),
+                               self._toUnits(high, ROUND_FLOOR))
+
+    def getRandomBid(self, low: Decimal, high: Decimal) -> Optional[Bid]:
+        """
+        Draws from the bids that may be inside the interval given the
+        rounding, until one is inside [low, high]. All SAMPLE_TRIES draws can
+        only miss when the interval is narrow compared to the rounding.
+
+        @return a bid drawn uniformly from the bids with utility inside
+                [low, high], or None if there is no such bid or none was
+                drawn in SAMPLE_TRIES draws.
+        """
+        # rounding changes the utility of a bid by at most half a unit per
+        # issue, so every bid inside [low, high] is inside [first, last]
+        margin = Decimal(len(self._issues)) / 2
+        first = self._toUnits(low, ROUND_CEILING, -margin)
+        last = self._toUnits(high, ROUND_FLOOR, margin)
+        total = self._countRest(0, first, last)
+        if total == 0:
+            return None
+        for _ in range(self.SAMPLE_TRIES):
+            bid, utility = self._drawBid(first, last, total)
+            if low <= utility <= high:
+                return bid
+        return None
+
+    def getBids(self, low: Decimal, high: Decimal) -> Iterator[Bid]:
+        """
+        @return all bids with utility inside [low, high], best values of the
+                first issues first.
+        """
+        for values in self._bids(0, Decimal(0), low, high):
+            yield Bid(dict(zip(self._issues, values)))
+
+    def _drawBid(self, first: int, last: int,
+                 total: int) -> Tuple[Bid, Decimal]:
+        """
+        @return a bid drawn uniformly from the total bids with a rounded
+                utility inside [first, last] units, and its exact utility
+        """
+        # descend into the subtree that holds the chosen position
+        position = randint(0, total - 1)
+        partial = 0
+        utility = Decimal(0)
+        issuevalues: Dict[str, Value] = {}
+        for i, issue in enumerate(self._issues):
+            for (util, value), units in zip(self._values[i], self._units[i]):
+                size = self._countRest(i + 1, first - partial - units,
+                                       last - partial - units)
+                if position < size:
+                    issuevalues[issue] = value
+                    partial += units
+                    utility += util
+                    break
+                position -= size
+        return Bid(issuevalues), utility
+
+    def _countRest(self, issue: int, first: int, last: int) -> int:
+        """
+        @return the number of completions of the issues from index issue
+                onwards with a rounded utility inside [first, last] units
+        """
+        if not self._tables:
+            self._buildTables()
+        table = self._tables[issue]
+        first = max(first - self._offsets[issue], 0)
+        last = min(last - self._offsets[issue], len(table) - 1)
+        if first > last:
+            return 0
+        return int(table[last] - (table[first - 1] if first > 0 else 0))
+
+    def _buildTables(self):
+        """
+        Rounds the weighted utilities to units of 10^-precision. Then builds,
+        for every issue, the cumulative number of completions of the issues
+        from there onwards per rounded utility, starting at the lowest rounded
+        utility of those issues.
+        """
+        self._units = [[
+            int(util.scaleb(self._precision).to_integral_value())
+            for util, _ in values
+        ] for values in self._values]
+        # counts beyond the int64 range are kept as python ints
+        dtype = np.int64 if self.size() < 2**62 else object
+        issues = len(self._issues)
+        self._offsets = [0] * (issues + 1)
+        self._tables = [np.ones(1, dtype=dtype)] * (issues + 1)
+        counts = np.ones(1, dtype=dtype)
+        for i in reversed(range(issues)):
+            units = self._units[i]
+            lowest = min(units, default=0)
+            extended = np.zeros(len(counts) + max(units, default=0) - lowest,
+                                dtype=dtype)
+            for unit in units:
+                extended[unit - lowest:unit - lowest + len(counts)] += counts
+            counts = extended
+            self._offsets[i] = self._offsets[i + 1] + lowest
+            self._tables[i] = np.cumsum(counts)
+
+    def _toUnits(self,
+                 utility: Decimal,
+                 rounding: str,
+                 margin: Decimal = Decimal(0)) -> int:
+        """
+        @return utility plus margin units, rounded to whole units
+        """
+        return int((utility.scaleb(self._precision) +
+                    margin).to_integral_value(rounding=rounding))
+
+    def _bids(self, issue: int, partial: Decimal, low: Decimal,
+              high: Decimal) -> Iterator[List[Value]]:
+        if (partial + self._maxRest[issue] < low
+                or partial + self._minRest[issue] > high):
+            return
+        if issue == len(self._issues):
+            yield []
+            return
+        for util, value in self._values[issue]:
+            if partial + util + self._maxRest[issue + 1] < low:
+                break
+            for rest in self._bids(issue + 1, partial + util, low, high):
+                yield [value] + rest
@@ -3,6 +3,7 @@ import os
 
 from utils.plot_trace import plot_trace
 from utils.runners import run_session
+from utils.trace_format import write_trace
 
 # create results directory if it does not exist
 if not os.path.exists("results"):
@@ -23,6 +24,9 @@ settings = {
     200,
 }
 
+# Format of the written trace: "json" or the compact columnar "npz" format
+TRACE_FORMAT = "json"
+
 # run a session and obtain results in dictionaries
 results_trace, results_summary = run_session(settings)
 
@@ -30,7 +34,10 @@ results_trace, results_summary = run_session(settings)
 plot_trace(results_trace, "results/trace_plot.html")
 
 # write results to file
-with open("results/results_trace.json", "w") as f:
-    f.write(json.dumps(results_trace, indent=2))
+if TRACE_FORMAT == "npz":
+    write_trace(results_trace, "results/results_trace.npz")
+else:
+    with open("results/results_trace.json", "w") as f:
+        f.write(json.dumps(results_trace, indent=2))
 with open("results/results_summary.json", "w") as f:
     f.write(json.dumps(results_summary, indent=2))
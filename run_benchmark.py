@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import sys
+
+from utils.agent_benchmark import benchmark_agent
+from utils.agent_benchmark import compare_to_baseline
+from utils.agent_benchmark import load_results
+
+# Measures the session setup cost and the p50/p95/p99 latency of a turn for
+# every agent on every domain. Each agent plays the A side of a domain against
+# a simulated opponent that offers random bids. The results are written as
+# JSON and can be compared against a stored baseline to catch regressions.
+
+AGENTS = [
+    "agents.boulware_agent.boulware_agent.BoulwareAgent",
+    "agents.conceder_agent.conceder_agent.ConcederAgent",
+    "agents.hardliner_agent.hardliner_agent.HardlinerAgent",
+    "agents.linear_agent.linear_agent.LinearAgent",
+    "agents.random_agent.random_agent.RandomAgent",
+    "agents.stupid_agent.stupid_agent.StupidAgent",
+    "agents.template_agent.template_agent.TemplateAgent",
+    "agents.custom_agents.custom_agent_0.CustomAgent",
+    "agents.randomp.randomparty.RandomParty.RandomParty",
+    "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty"
+]
+
+parser = argparse.ArgumentParser(description="Benchmark the agents")
+
+if __name__ == "__main__":
+    parser.add_argument("--domains",
+                        nargs='*',
+                        help="List of domains to use",
+                        default=[str(x) for x in range(10)])
+    parser.add_argument("--agents",
+                        nargs='*',
+                        help="List of agents to use",
+                        default=[x.split(".")[-1] for x in AGENTS])
+    parser.add_argument("--rounds",
+                        type=int,
+                        help="Number of turns per agent",
+                        default=200)
+    parser.add_argument("--output",
+                        help="File to write the results to",
+                        default="results/benchmark.json")
+    parser.add_argument("--baseline",
+                        help="Earlier results to compare against",
+                        default=None)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Allowed relative slowdown compared to the baseline",
+        default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    for agent in [x for x in AGENTS if x.split(".")[-1] in args.agents]:
+        agent_name = agent.split(".")[-1]
+        results[agent_name] = {}
+        for domain in ["domain0" + x for x in args.domains]:
+            metrics = benchmark_agent(agent,
+                                      f"domains/{domain}/profileA.json",
+                                      f"domains/{domain}/profileB.json",
+                                      args.rounds)
+            results[agent_name][domain] = metrics
+            print(f"{agent_name} {domain}: setup {metrics['setup_ms']:.2f}ms, "
+                  f"p50 {metrics['p50_ms']:.3f}ms, "
+                  f"p95 {metrics['p95_ms']:.3f}ms, "
+                  f"p99 {metrics['p99_ms']:.3f}ms")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    if args.baseline is not None:
+        regressions = compare_to_baseline(results,
+                                          load_results(args.baseline),
+                                          args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+from decimal import Decimal
+from time import perf_counter
+
+from geniusweb.bidspace.BidsWithUtility import BidsWithUtility
+from geniusweb.bidspace.Interval import Interval
+
+from agents.time_dependent_agent.interval_bids import IntervalBids
+from utils.runners import get_utility_function
+
+# Compares the IntervalBids engine with the geniusweb
+# BidsWithUtility path that ExtendedUtilSpace used before. For every domain
+# both compute the utility range and then answer interval queries for goals
+# spread over that range. Times are in milliseconds, the counts show how many
+# bids both engines found in every interval.
+
+parser = argparse.ArgumentParser(
+    description="Benchmark the bid space interval queries")
+
+if __name__ == "__main__":
+    parser.add_argument("--domains",
+                        nargs='*',
+                        help="List of domains to use",
+                        default=[str(x) for x in range(10)])
+    parser.add_argument("--goals",
+                        type=int,
+                        help="Number of utility goals per domain",
+                        default=10)
+    parser.add_argument("--width",
+                        type=float,
+                        help="Width of the utility interval below a goal",
+                        default=0.05)
+    parser.add_argument("--output",
+                        help="File to write the results to",
+                        default="results/bidspace_benchmark.json")
+    args = parser.parse_args()
+    width = Decimal(str(args.width))
+
+    results = {}
+    for domain in ["domain0" + x for x in args.domains]:
+        space = get_utility_function(f"file:domains/{domain}/profileA.json")
+
+        start = perf_counter()
+        bidutils = BidsWithUtility.create(space)
+        utility_range = bidutils.getRange()
+        geniusweb_setup = perf_counter() - start
+
+        start = perf_counter()
+        intervals = IntervalBids(space)
+        interval_setup = perf_counter() - start
+
+        low, high = intervals.getMin(), intervals.getMax()
+        goals = [
+            low + (high - low) * Decimal(i) / max(args.goals - 1, 1)
+            for i in range(args.goals)
+        ]
+
+        geniusweb_query = 0.0
+        interval_query = 0.0
+        counts = []
+        for goal in goals:
+            start = perf_counter()
+            options = bidutils.getBids(Interval(goal - width, goal))
+            geniusweb_count = options.size()
+            geniusweb_query += perf_counter() - start
+
+            start = perf_counter()
+            interval_count = intervals.count(goal - width, goal)
+            intervals.getRandomBid(goal - width, goal)
+            interval_query += perf_counter() - start
+            counts.append([geniusweb_count, interval_count])
+
+        results[domain] = {
+            "bids": intervals.size(),
+            "geniusweb_range": [
+                float(utility_range.getMin()),
+                float(utility_range.getMax())
+            ],
+            "interval_range": [float(low), float(high)],
+            "geniusweb_setup_ms": geniusweb_setup * 1000,
+            "interval_setup_ms": interval_setup * 1000,
+            "geniusweb_query_ms": geniusweb_query * 1000 / len(goals),
+            "interval_query_ms": interval_query * 1000 / len(goals),
+            "counts": counts,
+        }
+        print(f"{domain} ({intervals.size()} bids): setup "
+              f"{geniusweb_setup * 1000:.2f}ms -> "
+              f"{interval_setup * 1000:.2f}ms, query "
+              f"{geniusweb_query * 1000 / len(goals):.3f}ms -> "
+              f"{interval_query * 1000 / len(goals):.3f}ms")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        f.write(json.dumps(results, indent=2))
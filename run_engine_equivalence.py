@@ -0,0 +1,89 @@
+import argparse
+import sys
+from itertools import permutations
+
+from utils.runners import run_session
+
+# Checks that the in-process "fast" engine produces the same negotiations as
+# the geniusweb NegoRunner. Every pairing of agents is run on every domain
+# with both engines and the same seed, after which the summaries and the
+# sequence of actions (type, bid and utilities) have to be identical.
+
+AGENTS = [
+    "agents.boulware_agent.boulware_agent.BoulwareAgent",
+    "agents.conceder_agent.conceder_agent.ConcederAgent",
+    "agents.hardliner_agent.hardliner_agent.HardlinerAgent",
+    "agents.linear_agent.linear_agent.LinearAgent",
+    "agents.random_agent.random_agent.RandomAgent",
+    "agents.stupid_agent.stupid_agent.StupidAgent",
+    "agents.template_agent.template_agent.TemplateAgent",
+    "agents.custom_agents.custom_agent_0.CustomAgent",
+    "agents.randomp.randomparty.RandomParty.RandomParty",
+    "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty"
+]
+
+parser = argparse.ArgumentParser(
+    description="Compare the fast engine against NegoRunner")
+
+
+def _action_sequence(results_trace):
+    """Actions without the party ids, which differ between the engines."""
+    sequence = []
+    for action in results_trace["actions"]:
+        for action_type, body in action.items():
+            sequence.append((action_type, body.get("bid"),
+                             list(body.get("utilities", {}).values())))
+    return sequence
+
+
+def compare_session(settings):
+    trace_ref, summary_ref = run_session({**settings, "engine": "negorunner"})
+    trace_fast, summary_fast = run_session({**settings, "engine": "fast"})
+
+    differences = []
+    if summary_ref != summary_fast:
+        differences.append(f"summary {summary_ref} != {summary_fast}")
+    if _action_sequence(trace_ref) != _action_sequence(trace_fast):
+        differences.append("action sequences differ")
+    return differences
+
+
+if __name__ == "__main__":
+    parser.add_argument("--domains",
+                        nargs='*',
+                        help="List of domains to use",
+                        default=[str(x) for x in range(10)])
+    parser.add_argument("--agents",
+                        nargs='*',
+                        help="List of agents to use",
+                        default=[x.split(".")[-1] for x in AGENTS])
+    parser.add_argument("--rounds",
+                        type=int,
+                        help="Deadline in rounds",
+                        default=200)
+    parser.add_argument("--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    agents = [x for x in AGENTS if x.split(".")[-1] in args.agents]
+    failures = 0
+    total = 0
+    for domain in ["domain0" + x for x in args.domains]:
+        for agent_duo in permutations(agents, 2):
+            settings = {
+                "agents": list(agent_duo),
+                "profiles": [
+                    f"domains/{domain}/profileA.json",
+                    f"domains/{domain}/profileB.json"
+                ],
+                "deadline_rounds": args.rounds,
+                "seed": args.seed
+            }
+            differences = compare_session(settings)
+            total += 1
+            if differences:
+                failures += 1
+                names = " vs ".join(x.split(".")[-1] for x in agent_duo)
+                print(f"MISMATCH {domain} {names}: {'; '.join(differences)}")
+
+    print(f"{total - failures} of {total} sessions are equivalent")
+    sys.exit(1 if failures else 0)
@@ -8,8 +8,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 from scipy.stats import norm
 
+from utils.checkpoints import SessionCheckpoints
 from utils.plot_trace import plot_trace
 from utils.runners import run_session
+from utils.trace_format import write_trace
 
 MATPLOTLIB = False
 TYPES = {
@@ -74,7 +76,12 @@ def save_as_image(title, values, file_):
     plt.close()
 
 
-def run_sessions(domain, opponent, ponpoko_params, num_samples):
+def run_sessions(domain,
+                 opponent,
+                 ponpoko_params,
+                 num_samples,
+                 trace_format="json",
+                 resume=False):
     # Create settings and generate results
     agents = ["agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty", opponent]
     profiles = [
@@ -91,16 +98,27 @@ def run_sessions(domain, opponent, ponpoko_params, num_samples):
     agent_name = opponent.split(".")[-1]
     res_dir = f"results/{domain}/AgentGrug_{agent_name}"
     Path(res_dir).mkdir(parents=True, exist_ok=True)
+    checkpoints = SessionCheckpoints(f"{res_dir}/checkpoints")
 
     for run in range(num_samples):
+        # when resuming, skip samples that already finished in an earlier run
+        settings["seed"] = run
+        if resume and checkpoints.load(settings) is not None:
+            continue
+
         results_trace, results_summary = run_session(settings)
 
         # Write raw results and plot
         plot_trace(results_trace, f"{res_dir}/trace_plot_(run-{run}).html")
-        with open(f"{res_dir}/results_trace_(run-{run}).json", "w") as f:
-            f.write(json.dumps(results_trace, indent=2))
+        if trace_format == "npz":
+            write_trace(results_trace,
+                        f"{res_dir}/results_trace_(run-{run}).npz")
+        else:
+            with open(f"{res_dir}/results_trace_(run-{run}).json", "w") as f:
+                f.write(json.dumps(results_trace, indent=2))
         with open(f"{res_dir}/results_summary_(run-{run}).json", "w") as f:
             f.write(json.dumps(results_summary, indent=2))
+        checkpoints.store(settings, results_summary)
 
 
 def analyse_results(domains, opponents):
@@ -194,6 +212,11 @@ def parser_init():
     parser.add_argument('--matplotlib',
                         action='store_true',
                         help="Whether to generate an image")
+    parser.add_argument(
+        "--trace-format",
+        choices=['json', 'npz'],
+        help="Format of the written session traces, npz is compact columnar",
+        default='json')
     parser.add_argument(
         "--opponent-epsilon-higher",
         metavar='Y.Y',
@@ -206,6 +229,11 @@ def parser_init():
         type=float,
         help="Inter-bid change to classify opponent as conceder or hardliner",
         default=0.1)
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Skip samples that finished in an earlier run, which does not "
+        "notice changes to the agent code")
 
 
 if __name__ == "__main__":
@@ -233,7 +261,8 @@ if __name__ == "__main__":
     for domain in domains:
         for opponent in opponents:
             run_process = Process(target=run_sessions,
-                                  args=(domain, opponent, PARAMS, SAMPLES))
+                                  args=(domain, opponent, PARAMS, SAMPLES,
+                                        args.trace_format, args.resume))
             run_process.start()
             process_list.append(run_process)
     for process in process_list:
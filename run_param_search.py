@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+
+from utils.param_search import OBJECTIVES
+from utils.param_search import random_search
+from utils.param_search import successive_halving
+
+# Searches the PonPoko parameters for the configuration that scores best on
+# an objective against the given opponents. Successive halving scores many
+# random configurations on a few sessions and only keeps sampling the best
+# ones, random search samples every configuration equally often.
+
+AGENTS = [
+    "agents.boulware_agent.boulware_agent.BoulwareAgent",
+    "agents.conceder_agent.conceder_agent.ConcederAgent",
+    "agents.hardliner_agent.hardliner_agent.HardlinerAgent",
+    "agents.linear_agent.linear_agent.LinearAgent",
+    "agents.random_agent.random_agent.RandomAgent",
+    "agents.stupid_agent.stupid_agent.StupidAgent",
+    "agents.template_agent.template_agent.TemplateAgent",
+    "agents.custom_agents.custom_agent_0.CustomAgent",
+    "agents.randomp.randomparty.RandomParty.RandomParty",
+    "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty"
+]
+
+# lists are picked from, (low, high) tuples are sampled uniformly
+SPACE = {
+    "patternChangeDelay": [-1, 5, 10, 20, 50],
+    "generatorType": [1, 2, 3, 4, 5],
+    "fallbackBidUtilRange": (0.01, 0.1),
+    "opponentEpsilonHigher": (0.05, 0.4),
+    "opponentEpsilonLower": (0.0, 0.2)
+}
+
+parser = argparse.ArgumentParser(description="Search the PonPoko parameters")
+
+if __name__ == "__main__":
+    parser.add_argument("--method",
+                        choices=['halving', 'random'],
+                        help="Search method",
+                        default='halving')
+    parser.add_argument("--objective",
+                        choices=list(OBJECTIVES),
+                        help="Objective to maximise",
+                        default='mean_utility')
+    parser.add_argument("--configurations",
+                        metavar='N',
+                        type=int,
+                        help="Number of random configurations",
+                        default=16)
+    parser.add_argument(
+        "--samples",
+        metavar='N',
+        type=int,
+        help="Sessions per configuration, of the first rung when halving",
+        default=2)
+    parser.add_argument("--eta",
+                        type=int,
+                        help="Reduction factor per rung when halving",
+                        default=2)
+    parser.add_argument("--workers",
+                        type=int,
+                        help="Maximum number of worker processes",
+                        default=os.cpu_count() or 1)
+    parser.add_argument("--domains",
+                        nargs='*',
+                        help="List of domains to use",
+                        default=['0', '1'])
+    parser.add_argument(
+        "--agents",
+        nargs='*',
+        help="List of opponents to use",
+        default=['BoulwareAgent', 'ConcederAgent', 'HardlinerAgent'])
+    parser.add_argument("--engine",
+                        choices=['geniusweb', 'fast'],
+                        help="Session engine to use",
+                        default='geniusweb')
+    parser.add_argument("--seed",
+                        type=int,
+                        help="Seed of the random configurations",
+                        default=0)
+    parser.add_argument("--output",
+                        help="File to write the results to",
+                        default="results/param_search.json")
+    args = parser.parse_args()
+
+    sessions = []
+    for domain in ["domain0" + x for x in args.domains]:
+        for opponent in AGENTS:
+            if opponent.split(".")[-1] not in args.agents:
+                continue
+            sessions.append({
+                "agents": [
+                    "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty",
+                    opponent
+                ],
+                "profiles": [
+                    f"domains/{domain}/profileA.json",
+                    f"domains/{domain}/profileB.json"
+                ],
+                "deadline_rounds": 200,
+                "engine": args.engine
+            })
+
+    if args.method == 'halving':
+        results = successive_halving(SPACE,
+                                     sessions,
+                                     objective=args.objective,
+                                     configurations=args.configurations,
+                                     min_samples=args.samples,
+                                     eta=args.eta,
+                                     workers=args.workers,
+                                     seed=args.seed)
+    else:
+        results = random_search(SPACE,
+                                sessions,
+                                objective=args.objective,
+                                configurations=args.configurations,
+                                samples=args.samples,
+                                workers=args.workers,
+                                seed=args.seed)
+
+    for result in results[:5]:
+        print(f"{args.objective} {result['score']:.4f} "
+              f"({result['samples']} sessions): {result['params']}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        f.write(json.dumps(results, indent=2))
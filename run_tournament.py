@@ -3,14 +3,17 @@ import os
 
 from utils.runners import run_tournament
 
-# create results directory if it does not exist
-if not os.path.exists("results"):
-    os.mkdir("results")
-
 # Settings to run a tournament:
 #   We need to specify the classpath all agents that will participate in the tournament
 #   We need to specify duos of preference profiles that will be played by the agents
 #   We need to specify a deadline of amount of rounds we can negotiate before we end without agreement
+#   We can specify the number of worker processes that run sessions in parallel (defaults to the CPU count)
+#   We can specify a JSON lines file that every finished session is appended to while the tournament runs
+#   We can specify a checkpoint directory ("checkpoint_dir") to resume an interrupted tournament, sessions that already have a result there are skipped.
+#   Checkpoints do not notice changes to the agent code, so leave it out or clear the directory after editing an agent
+#   We can pick the "fast" in-process engine instead of the geniusweb NegoRunner for all sessions
+#   With the fast engine we can set "clock" to "virtual", agent delays are then simulated instead of waited for
+#   We can make the sessions quiet, which drops all agent log messages instead of keeping them for failed sessions
 tournament_settings = {
     "agents": [
         "agents.boulware_agent.boulware_agent.BoulwareAgent",
@@ -30,14 +33,22 @@ tournament_settings = {
     ],
     "deadline_rounds":
     200,
+    "results_file":
+    "results/tournament.jsonl",
 }
 
-# run a session and obtain results in dictionaries
-tournament, results_summaries = run_tournament(tournament_settings)
+# the pool workers import this module, so only the main process may run it
+if __name__ == "__main__":
+    # create results directory if it does not exist
+    if not os.path.exists("results"):
+        os.mkdir("results")
+
+    # run a session and obtain results in dictionaries
+    tournament, results_summaries = run_tournament(tournament_settings)
 
-# save the tournament settings for reference
-with open("results/tournament.json", "w") as f:
-    f.write(json.dumps(tournament, indent=2))
-# save the result summaries
-with open("results/results_summaries.json", "w") as f:
-    f.write(json.dumps(results_summaries, indent=2))
+    # save the tournament settings for reference
+    with open("results/tournament.json", "w") as f:
+        f.write(json.dumps(tournament, indent=2))
+    # save the result summaries
+    with open("results/results_summaries.json", "w") as f:
+        f.write(json.dumps(results_summaries, indent=2))
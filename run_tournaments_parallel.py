@@ -30,13 +30,16 @@ tournament_settings = {
     "deadline_rounds":
     200,
     "ponpoko_params": {},
-    "no_warning": 1
+    "no_warning": 1,
+    # every combination already runs in its own process
+    "workers": 1
 }
 
 
 def run_test_tournament(tournament_settings, test_freq, gen_type, test_sample):
     tournament_settings["ponpoko_params"]["patternChangeDelay"] = test_freq
     tournament_settings["ponpoko_params"]["generatorType"] = gen_type
+    tournament_settings["seed"] = test_sample
 
     # run a session and obtain results in dictionaries
     tournament, results_summaries = run_tournament(tournament_settings)
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime
+from datetime import timedelta
+from importlib import import_module
+from random import Random
+from time import perf_counter
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+from geniusweb.actions.Action import Action
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Agreements import Agreements
+from geniusweb.inform.Finished import Finished
+from geniusweb.inform.Settings import Settings
+from geniusweb.inform.YourTurn import YourTurn
+from geniusweb.progress.ProgressRounds import ProgressRounds
+from geniusweb.references.Parameters import Parameters
+from geniusweb.references.ProfileRef import ProfileRef
+from geniusweb.references.ProtocolRef import ProtocolRef
+from uri.uri import URI
+
+from utils.runners import get_utility_function
+
+
+class _RecordingConnection:
+    """Connection that keeps the last action the benchmarked party sent."""
+
+    def __init__(self):
+        self.action: Optional[Action] = None
+
+    def send(self, action: Action):
+        self.action = action
+
+    def addListener(self, listener):
+        pass
+
+    def removeListener(self, listener):
+        pass
+
+    def close(self):
+        pass
+
+
+def benchmark_agent(agent: str,
+                    profile: str,
+                    opponent_profile: str,
+                    rounds: int = 200,
+                    seed: int = 0) -> Dict[str, float]:
+    """
+    Drives a single agent through a synthetic SAOP session and times it.
+
+    The agent is informed of its Settings and then, every round, of a random
+    offer from a simulated opponent followed by its own turn. The opponent
+    offers are generated up front from a seeded random generator, so every
+    run of the benchmark sees the same session.
+
+    @param agent the classpath of the agent
+    @param profile the profile file of the agent
+    @param opponent_profile the profile file of the simulated opponent
+    @param rounds the number of turns of the agent
+    @param seed seed of the opponent offers
+    @return setup cost and turn latency percentiles in milliseconds
+    """
+    domain = get_utility_function(f"file:{opponent_profile}").getDomain()
+    all_bids = AllBidsList(domain)
+    generator = Random(seed)
+    opponent = PartyId("opponent")
+    offers = [
+        Offer(opponent, all_bids.get(generator.randrange(all_bids.size())))
+        for _ in range(rounds)
+    ]
+
+    me = PartyId("benchmarked")
+    connection = _RecordingConnection()
+    endtime = datetime.now() + timedelta(days=1)
+    settings = Settings(me, ProfileRef(URI(f"file:{profile}")),
+                        ProtocolRef(URI("SAOP")),
+                        ProgressRounds(rounds, 0, endtime), Parameters({}))
+
+    # import the agent first, so its one-off import is not part of the setup
+    module, name = agent.rsplit(".", 1)
+    party_class = getattr(import_module(module), name)
+
+    # setup: creating the party and handling the Settings
+    start = perf_counter()
+    party = party_class()
+    party.connect(connection)
+    party.notifyChange(settings)
+    setup = perf_counter() - start
+
+    latencies: List[float] = []
+    for offer in offers:
+        party.notifyChange(ActionDone(offer))
+        connection.action = None
+        start = perf_counter()
+        party.notifyChange(YourTurn())
+        latencies.append(perf_counter() - start)
+        if connection.action is not None:
+            party.notifyChange(ActionDone(connection.action))
+    party.notifyChange(Finished(Agreements({})))
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "setup_ms": setup * 1000,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "turns": len(latencies),
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict,
+                        tolerance: float) -> List[str]:
+    """
+    @param results benchmark results as written by the benchmark script
+    @param baseline earlier results in the same layout
+    @param tolerance allowed relative slowdown, 0.2 means 20%
+    @return a description of every metric that got slower than allowed
+    """
+    regressions = []
+    for agent, domains in results.items():
+        for domain, metrics in domains.items():
+            reference = baseline.get(agent, {}).get(domain)
+            if reference is None:
+                continue
+            for metric in ["setup_ms", "p50_ms", "p95_ms", "p99_ms"]:
+                if metrics[metric] > reference[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{agent} {domain} {metric}: "
+                        f"{reference[metric]:.3f} -> {metrics[metric]:.3f}")
+    return regressions
+
+
+def load_results(results_file: str) -> dict:
+    with open(results_file) as f:
+        return json.load(f)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+# content hashes of profile files, keyed by path, mtime and size
+_profile_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def session_key(settings: dict) -> str:
+    """
+    Stable hash of everything that determines the outcome of a session: the
+    agent classpaths, the contents of the profile files, the deadline, the
+    agent and PonPoko parameters and the seed. Renaming or moving a profile
+    file does not change the key, editing it does.
+    """
+    content = {
+        "agents": settings["agents"],
+        "profiles": [_profile_hash(x) for x in settings["profiles"]],
+        "deadline_rounds": settings.get("deadline_rounds"),
+        "ponpoko_params": settings.get("ponpoko_params"),
+        "seed": settings.get("seed"),
+    }
+    # only part of the key when given, so older checkpoints stay valid
+    for optional in ["deadline_time_ms", "parameters"]:
+        if optional in settings:
+            content[optional] = settings[optional]
+    encoded = json.dumps(content, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _profile_hash(path: str) -> str:
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+    if stamp not in _profile_hashes:
+        with open(path, "rb") as f:
+            _profile_hashes[stamp] = hashlib.sha256(f.read()).hexdigest()
+    return _profile_hashes[stamp]
+
+
+class SessionCheckpoints:
+    """
+    Directory with one content-addressed result file per finished session.
+
+    A session whose key already has a file is done and does not have to be
+    run again when an interrupted job is restarted.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, settings: dict) -> Optional[dict]:
+        """
+        @param settings the session settings
+        @return the stored results summary, or None if the session has not
+                finished before
+        """
+        try:
+            with open(self._path(settings)) as f:
+                return json.load(f)["summary"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, settings: dict, results_summary: dict):
+        path = self._path(settings)
+        record = {"settings": settings, "summary": results_summary}
+
+        # write to a temporary file first so a crash never leaves a partial
+        # checkpoint behind that would be mistaken for a finished session
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(json.dumps(record, indent=2))
+        os.replace(temp_path, path)
+
+    def _path(self, settings: dict) -> str:
+        return os.path.join(self._directory, f"{session_key(settings)}.json")
@@ -0,0 +1,79 @@
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditiveUtilitySpace import \
+    LinearAdditiveUtilitySpace
+
+# float64 utilities differ from the Decimal path by rounding error only
+TOLERANCE = 1e-12
+
+
+class CompiledUtilitySpace:
+    """
+    Float representation of a LinearAdditiveUtilitySpace.
+
+    Every issue gets a row in a value utility lookup table and a weight, so a
+    batch of bids encoded as value index rows is evaluated with a single
+    gather and dot product. Results match LinearAdditiveUtilitySpace.getUtility
+    within TOLERANCE. Issue values that are missing from a bid or unknown to
+    the domain point to a padding column with utility 0, like they do in the
+    Decimal implementation.
+    """
+
+    def __init__(self, space: LinearAdditiveUtilitySpace):
+        domain = space.getDomain()
+        self._issues: List[str] = sorted(domain.getIssues())
+        self._value_index: List[Dict[Value, int]] = []
+
+        issue_values = [list(domain.getValues(iss)) for iss in self._issues]
+        self._padding = max((len(values) for values in issue_values),
+                            default=0)
+
+        utilities = space.getUtilities()
+        weights = space.getWeights()
+        self._weights = np.array(
+            [float(weights[iss]) for iss in self._issues], dtype=np.float64)
+        self._value_utils = np.zeros((len(self._issues), self._padding + 1),
+                                     dtype=np.float64)
+        for row, (iss, values) in enumerate(zip(self._issues, issue_values)):
+            self._value_index.append(
+                {value: col
+                 for col, value in enumerate(values)})
+            for col, value in enumerate(values):
+                self._value_utils[row, col] = float(
+                    utilities[iss].getUtility(value))
+
+    def issues(self) -> List[str]:
+        return self._issues
+
+    def encode(self, bids: Sequence[Bid]) -> np.ndarray:
+        """
+        @param bids the bids to encode
+        @return array of shape (len(bids), issues) with the value index of
+                every issue of every bid
+        """
+        rows = np.full((len(bids), len(self._issues)),
+                       self._padding,
+                       dtype=np.intp)
+        for row, bid in enumerate(bids):
+            for col, (iss, index) in enumerate(
+                    zip(self._issues, self._value_index)):
+                value = bid.getValue(iss)
+                if value is not None:
+                    rows[row, col] = index.get(value, self._padding)
+        return rows
+
+    def utilities(self, rows: np.ndarray) -> np.ndarray:
+        """
+        @param rows encoded bids as returned by encode
+        @return the utility of every encoded bid
+        """
+        issue_index = np.arange(len(self._issues))
+        return self._value_utils[issue_index, rows] @ self._weights
+
+    def utility(self, bid: Bid) -> float:
+        return float(self.utilities(self.encode([bid]))[0])
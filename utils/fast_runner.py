@@ -0,0 +1,274 @@
+import logging
+from datetime import datetime
+from datetime import timedelta
+from importlib import import_module
+from time import perf_counter
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Action import Action
+from geniusweb.actions.EndNegotiation import EndNegotiation
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Agreements import Agreements
+from geniusweb.inform.Finished import Finished
+from geniusweb.inform.Inform import Inform
+from geniusweb.inform.Settings import Settings
+from geniusweb.inform.YourTurn import YourTurn
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.party.DefaultParty import DefaultParty
+from geniusweb.progress.Progress import Progress
+from geniusweb.progress.ProgressRounds import ProgressRounds
+from geniusweb.progress.ProgressTime import ProgressTime
+from geniusweb.references.Parameters import Parameters
+from geniusweb.references.ProfileRef import ProfileRef
+from geniusweb.references.ProtocolRef import ProtocolRef
+from pyson.ObjectMapper import ObjectMapper
+from tudelft_utilities_logging.Reporter import Reporter
+from uri.uri import URI
+
+from agents.ponpokoagent.ponpoko.clock import setTimeSource
+from agents.time_dependent_agent.clock import Clock
+from agents.time_dependent_agent.clock import setClock
+from agents.time_dependent_agent.clock import VirtualClock
+from agents.time_dependent_agent.clock import WallClock
+
+
+class _DirectConnection:
+    """
+    Connection handed to a party, actions it sends are stored on the session
+    instead of going through a protocol connection.
+    """
+
+    def __init__(self, session: "FastSAOPSession", party: PartyId):
+        self._session = session
+        self._party = party
+
+    def send(self, action: Action):
+        self._session._receive(self._party, action)
+
+    def addListener(self, listener):
+        pass
+
+    def removeListener(self, listener):
+        pass
+
+    def getReference(self):
+        return None
+
+    def getRemoteURI(self):
+        return None
+
+    def getError(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FastSAOPSession:
+    """
+    In-process SAOP session with a DeadlineRounds or, if rounds is None, a
+    DeadlineTime deadline.
+
+    The parties are instantiated directly and receive their Settings, YourTurn,
+    ActionDone and Finished informs through direct notifyChange calls, which
+    skips the NegoRunner, connection factory and settings parsing machinery.
+    Parties take turns in order, every action is sent to all parties, an
+    Accept of the last offer ends the session with an agreement and a round
+    ends when every party had a turn, like in the geniusweb SAOP protocol.
+
+    With a virtual clock the session runs in simulated time: the clock is
+    installed as the clock of the parties for the duration of the session,
+    it is advanced by the wall time every party spends handling an inform
+    and sleeping parties advance it instantly. Time deadlines and delays are
+    then reached without waiting for them.
+    """
+
+    def __init__(self,
+                 agents: List[str],
+                 profiles: List[str],
+                 parameters: List[dict],
+                 rounds: Optional[int],
+                 durationms: int,
+                 reporter: Reporter,
+                 clock: Optional[VirtualClock] = None):
+        self._agents = agents
+        self._profiles = profiles
+        self._parameters = parameters
+        self._rounds = rounds
+        self._durationms = durationms
+        self._reporter = reporter
+        self._virtualClock = clock
+        self._clock: Clock = WallClock() if clock is None else clock
+
+        self._ids = [
+            PartyId(f"party_{agent.split('.')[-1]}_{index}")
+            for index, agent in enumerate(agents, 1)
+        ]
+        self._parties: List[DefaultParty] = []
+        self._actions: List[Action] = []
+        self._pending: Optional[Action] = None
+        self._lastOffer: Optional[Bid] = None
+        self._progress: Optional[Progress] = None
+        self._agreement: Optional[Bid] = None
+        self._error: Optional[str] = None
+
+    def run(self):
+        if self._virtualClock is None:
+            self._run()
+            return
+        # PonPoko keeps its own time source to stay a standalone package
+        previous = setClock(self._virtualClock)
+        previousTime = setTimeSource(self._virtualClock.time)
+        try:
+            self._run()
+        finally:
+            setClock(previous)
+            setTimeSource(previousTime)
+
+    def _run(self):
+        start = datetime.fromtimestamp(self._clock.time())
+        if self._rounds is None:
+            self._progress = ProgressTime(self._durationms, start)
+        else:
+            endtime = start + timedelta(milliseconds=self._durationms)
+            self._progress = ProgressRounds(self._rounds, 0, endtime)
+
+        # create all parties before any of them is informed, like NegoRunner
+        for party_id, agent in zip(self._ids, self._agents):
+            module, name = agent.rsplit(".", 1)
+            party = getattr(import_module(module), name)()
+            party.connect(_DirectConnection(self, party_id))
+            self._parties.append(party)
+
+        for party, party_id, profile, parameters in zip(
+                self._parties, self._ids, self._profiles, self._parameters):
+            self._notify(
+                party,
+                Settings(party_id, ProfileRef(URI(profile)),
+                         ProtocolRef(URI("SAOP")), self._progress,
+                         Parameters(parameters)))
+
+        turn = 0
+        while (self._error is None and self._agreement is None
+               and not self._progress.isPastDeadline(
+                   round(self._clock.time() * 1000))):
+            party_id = self._ids[turn]
+            self._pending = None
+            self._notify(self._parties[turn], YourTurn())
+            if self._error is not None:
+                break
+
+            action = self._pending
+            if not self._isValid(party_id, action):
+                break
+            self._actions.append(action)
+            for party in self._parties:
+                self._notify(party, ActionDone(action))
+            if isinstance(action, EndNegotiation):
+                break
+
+            turn = (turn + 1) % len(self._parties)
+            if turn == 0 and isinstance(self._progress, ProgressRounds):
+                self._progress = self._progress.advance()
+
+        agreements = {}
+        if self._agreement is not None:
+            agreements = {party_id: self._agreement for party_id in self._ids}
+        for party in self._parties:
+            self._notify(party, Finished(Agreements(agreements)))
+
+    def getActions(self) -> List[Action]:
+        return self._actions
+
+    def getError(self) -> Optional[str]:
+        return self._error
+
+    def getAgentNames(self) -> Dict[str, str]:
+        """Python class name of every party, in participant order."""
+        return {
+            party_id.getName(): agent.split(".")[-1]
+            for party_id, agent in zip(self._ids, self._agents)
+        }
+
+    def getProfiles(self) -> Dict[str, str]:
+        """Profile URI of every party, in participant order."""
+        return {
+            party_id.getName(): profile
+            for party_id, profile in zip(self._ids, self._profiles)
+        }
+
+    def toJson(self) -> dict:
+        """The session in the layout of a serialised SAOPState."""
+        mapper = ObjectMapper()
+        actions = []
+        for action in self._actions:
+            body = {"actor": action.getActor().getName()}
+            if isinstance(action, (Offer, Accept)):
+                body["bid"] = mapper.toJson(action.getBid())
+            actions.append({type(action).__name__: body})
+
+        partyprofiles = {
+            party_id.getName(): {
+                "party": {
+                    "partyref": f"pythonpath:{agent}",
+                    "parameters": parameters,
+                },
+                "profile": profile,
+            }
+            for party_id, agent, profile, parameters in zip(
+                self._ids, self._agents, self._profiles, self._parameters)
+        }
+        return {
+            "SAOPState": {
+                "actions": actions,
+                "connections": [x.getName() for x in self._ids],
+                "partyprofiles": partyprofiles,
+                "progress": mapper.toJson(self._progress),
+                "error": self._error,
+            }
+        }
+
+    def _receive(self, party_id: PartyId, action: Action):
+        if self._pending is not None:
+            self._fail(f"{party_id.getName()} sent more than one action")
+        self._pending = action
+
+    def _isValid(self, party_id: PartyId, action: Optional[Action]) -> bool:
+        if action is None:
+            self._fail(f"{party_id.getName()} did not act on its turn")
+        elif action.getActor() != party_id:
+            self._fail(f"{party_id.getName()} acted as {action.getActor()}")
+        elif isinstance(action, Offer):
+            self._lastOffer = action.getBid()
+            return True
+        elif isinstance(action, Accept):
+            if (self._lastOffer is not None
+                    and self._lastOffer == action.getBid()):
+                self._agreement = action.getBid()
+                return True
+            self._fail(f"{party_id.getName()} accepted a bid that was not "
+                       "the last offer")
+        elif isinstance(action, EndNegotiation):
+            return True
+        else:
+            self._fail(f"{party_id.getName()} sent unsupported {action}")
+        return False
+
+    def _notify(self, party: DefaultParty, info: Inform):
+        start = perf_counter()
+        try:
+            party.notifyChange(info)
+        except Exception as ex:
+            self._fail(f"{type(party).__name__} failed to handle {info}", ex)
+        if self._virtualClock is not None:
+            self._virtualClock.advance(perf_counter() - start)
+
+    def _fail(self, message: str, ex: Optional[BaseException] = None):
+        self._reporter.log(logging.WARNING, message, ex)
+        if self._error is None:
+            self._error = message
@@ -0,0 +1,216 @@
+from multiprocessing import Pool
+from random import Random
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from utils.runners import run_session
+from utils.std_out_reporter import NullReporter
+
+
+def mean_utility(summaries: List[dict], agent: str) -> float:
+    """Mean utility of the agent, sessions without agreement count as 0."""
+    return _mean([_utility(x, agent) for x in summaries])
+
+
+def nash_product(summaries: List[dict], agent: str) -> float:
+    """Mean nash product of the sessions."""
+    return _mean([x["nash_product"] for x in summaries])
+
+
+def agreement_rate(summaries: List[dict], agent: str) -> float:
+    """Fraction of the sessions that ended with an agreement."""
+    return _mean([1.0 if x["result"] == "agreement" else 0.0
+                  for x in summaries])
+
+
+OBJECTIVES: Dict[str, Callable[[List[dict], str], float]] = {
+    "mean_utility": mean_utility,
+    "nash_product": nash_product,
+    "agreement_rate": agreement_rate,
+}
+
+
+def sample_configurations(space: dict, count: int, seed: int = 0) -> List[dict]:
+    """
+    Draws random parameter configurations from a parameter space.
+
+    Every parameter of the space is either a list of values, of which one is
+    picked, or a (low, high) tuple, which is sampled uniformly. A tuple of
+    two ints gives an int, anything else a float.
+    """
+    generator = Random(seed)
+    configurations = []
+    for _ in range(count):
+        configuration = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    configuration[name] = generator.randint(low, high)
+                else:
+                    configuration[name] = generator.uniform(low, high)
+            else:
+                configuration[name] = generator.choice(values)
+        configurations.append(configuration)
+    return configurations
+
+
+def successive_halving(space: dict,
+                       sessions: List[dict],
+                       objective: str = "mean_utility",
+                       agent: str = "PonPokoParty",
+                       configurations: int = 16,
+                       min_samples: int = 2,
+                       eta: int = 2,
+                       rungs: int = 4,
+                       workers: int = 1,
+                       seed: int = 0) -> List[dict]:
+    """
+    Searches a parameter space for the configuration with the best objective.
+
+    Random configurations are drawn from the space and all of them are scored
+    on min_samples sessions. Only the best 1/eta of them move on to the next
+    rung, where they are scored on eta times as many sessions, until rungs
+    rounds are done or one configuration is left. Clearly bad configurations
+    are therefore dropped after a few sessions, while the good ones get the
+    most samples. The sessions of every rung are run on one pool of at most
+    workers processes.
+
+    The sessions are shuffled once with the seed and then interleaved over
+    the profile sets, so the first samples already cover different domains
+    and opponents. Sample k of every configuration is session k of that
+    (cycled) order with seed k, so all configurations are compared on the
+    same sessions.
+
+    @param space the parameter space, see sample_configurations
+    @param sessions session settings without ponpoko_params and seed
+    @param objective name of the objective in OBJECTIVES, higher is better
+    @param agent class name of the agent whose utility is optimised
+    @param configurations number of configurations to start with
+    @param min_samples number of sessions of every configuration in rung 0
+    @param eta the factor by which the configurations are reduced per rung
+    @param rungs the maximum number of rungs
+    @param workers the maximum number of worker processes
+    @param seed seed of the drawn configurations and the session order
+    @return every configuration with its score and number of samples, the
+        best first
+    """
+    score = OBJECTIVES[objective]
+    candidates = sample_configurations(space, configurations, seed)
+    sessions = _spread_sessions(sessions, seed)
+    summaries: List[List[dict]] = [[] for _ in candidates]
+    scores = [0.0] * len(candidates)
+    alive = list(range(len(candidates)))
+
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        samples = min_samples
+        for _ in range(rungs):
+            tasks = [(index, _sample_settings(sessions, k, candidates[index]))
+                     for index in alive
+                     for k in range(len(summaries[index]), samples)]
+            for index, summary in _run_tasks(tasks, pool):
+                summaries[index].append(summary)
+            for index in alive:
+                scores[index] = score(summaries[index], agent)
+
+            alive.sort(key=lambda x: scores[x], reverse=True)
+            if len(alive) <= 1:
+                break
+            alive = alive[:max(1, len(alive) // eta)]
+            samples *= eta
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    results = [{
+        "params": candidates[index],
+        "score": scores[index],
+        "samples": len(summaries[index]),
+    } for index in range(len(candidates))]
+    # the survivors of the last rung first, then by score
+    results.sort(key=lambda x: (x["samples"], x["score"]), reverse=True)
+    return results
+
+
+def random_search(space: dict,
+                  sessions: List[dict],
+                  objective: str = "mean_utility",
+                  agent: str = "PonPokoParty",
+                  configurations: int = 16,
+                  samples: int = 5,
+                  workers: int = 1,
+                  seed: int = 0) -> List[dict]:
+    """
+    Scores random configurations on the same number of sessions each, which
+    is successive halving with a single rung. See successive_halving.
+    """
+    return successive_halving(space,
+                              sessions,
+                              objective=objective,
+                              agent=agent,
+                              configurations=configurations,
+                              min_samples=samples,
+                              rungs=1,
+                              workers=workers,
+                              seed=seed)
+
+
+def _spread_sessions(sessions: List[dict], seed: int) -> List[dict]:
+    """
+    Shuffles the sessions and then takes one session of every profile set in
+    turn, so consecutive sessions are on different domains.
+    """
+    shuffled = list(sessions)
+    Random(seed).shuffle(shuffled)
+    groups: Dict[str, List[dict]] = {}
+    for settings in shuffled:
+        groups.setdefault(repr(settings.get("profiles")), []).append(settings)
+    spread = []
+    for position in range(max(map(len, groups.values()), default=0)):
+        for group in groups.values():
+            if position < len(group):
+                spread.append(group[position])
+    return spread
+
+
+def _sample_settings(sessions: List[dict], sample: int,
+                     ponpoko_params: dict) -> dict:
+    settings = dict(sessions[sample % len(sessions)])
+    settings["ponpoko_params"] = ponpoko_params
+    settings["seed"] = sample
+    return settings
+
+
+def _run_tasks(tasks: List[Tuple[int, dict]],
+               pool) -> Iterator[Tuple[int, dict]]:
+    """Yields (configuration index, summary) of the tasks as they finish."""
+    if pool is None:
+        yield from map(_run_task, tasks)
+    else:
+        yield from pool.imap_unordered(_run_task, tasks)
+
+
+def _run_task(task: Tuple[int, dict]) -> Tuple[int, dict]:
+    index, settings = task
+    _, results_summary = run_session(settings,
+                                     summary_only=True,
+                                     reporter=NullReporter())
+    return index, results_summary
+
+
+def _utility(summary: dict, agent: str) -> float:
+    position = 1
+    while f"agent_{position}" in summary:
+        if summary[f"agent_{position}"] == agent:
+            return summary[f"utility_{position}"]
+        position += 1
+    raise ValueError(f"{agent} did not take part in the session")
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
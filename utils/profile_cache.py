@@ -0,0 +1,43 @@
+import os
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+
+from agents.bid_space.lru_cache import LRUCache
+
+
+class ProfileCache:
+    """
+    Bounded least-recently-used cache of objects loaded from a profile URI.
+
+    Entries are keyed by the URI together with the modification time and size
+    of the file behind it, so a profile that is edited on disk is loaded again
+    instead of being served stale. Every process has its own instance, which
+    makes it a per-worker cache when tournaments run on a process pool.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], maxsize: int = 64):
+        self._loader = loader
+        self._entries: LRUCache[Any] = LRUCache(maxsize)
+
+    def get(self, profile_uri: str) -> Any:
+        return self._entries.get(self._key(profile_uri),
+                                 lambda: self._loader(profile_uri))
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self) -> Dict[str, int]:
+        return self._entries.info()
+
+    @staticmethod
+    def _key(profile_uri: str) -> Hashable:
+        if profile_uri.startswith("file:"):
+            try:
+                stat = os.stat(profile_uri[len("file:"):])
+                return profile_uri, stat.st_mtime_ns, stat.st_size
+            except OSError:
+                # let the loader report the missing file
+                pass
+        return profile_uri
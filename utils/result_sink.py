@@ -0,0 +1,67 @@
+import json
+from time import monotonic
+from typing import List
+from typing import Tuple
+
+
+class ResultSink:
+    """
+    JSON lines file with one record per finished session of a tournament.
+
+    The file is emptied when the sink is opened, so it only ever holds the
+    sessions of the current tournament, after which records are appended.
+    Records are buffered and flushed every flush_every sessions or once
+    flush_interval seconds have passed since the last flush, so a crashed
+    tournament loses at most the last few sessions.
+    """
+
+    def __init__(self, path: str, flush_every: int = 10,
+                 flush_interval: float = 30.0):
+        self._file = open(path, "w")
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = monotonic()
+
+    def write(self, settings: dict, results_summary: dict):
+        record = {"settings": settings, "summary": results_summary}
+        self._file.write(json.dumps(record) + "\n")
+        self._pending += 1
+        if (self._pending >= self._flush_every
+                or monotonic() - self._last_flush >= self._flush_interval):
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_results(path: str) -> Tuple[List[dict], List[dict]]:
+    """
+    Loads a file written by ResultSink back into the tournament settings and
+    results summaries lists that run_tournament returns. A partially written
+    last line, as left behind by a crash, is ignored.
+    """
+    tournament = []
+    results_summaries = []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            tournament.append(record["settings"])
+            results_summaries.append(record["summary"])
+    return tournament, results_summaries
@@ -1,7 +1,16 @@
+import os
+import random
+from functools import partial
 from itertools import permutations
 from math import factorial
+from multiprocessing import Pool
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
 from typing import Tuple
 
+from geniusweb.actions.Accept import Accept
 from geniusweb.profile.utilityspace.LinearAdditiveUtilitySpace import \
     LinearAdditiveUtilitySpace
 from geniusweb.profileconnection.ProfileConnectionFactory import \
@@ -12,22 +21,81 @@ from geniusweb.simplerunner.ClassPathConnectionFactory import \
     ClassPathConnectionFactory
 from geniusweb.simplerunner.NegoRunner import NegoRunner
 from pyson.ObjectMapper import ObjectMapper
+from tudelft_utilities_logging.Reporter import Reporter
 from uri.uri import URI
 from agents.ponpokoagent import ponpoko
+from agents.time_dependent_agent.clock import VirtualClock
 
 from utils.ask_proceed import ask_proceed
+from utils.checkpoints import SessionCheckpoints
+from utils.compiled_utility_space import CompiledUtilitySpace
+from utils.fast_runner import FastSAOPSession
+from utils.profile_cache import ProfileCache
+from utils.result_sink import ResultSink
+from utils.std_out_reporter import BufferedReporter
+from utils.std_out_reporter import NullReporter
 from utils.std_out_reporter import StdOutReporter
 
+# agents that read the wall time instead of the clock of the session
+WALL_TIME_AGENTS = ["agents.ponpoko_base_agent.ponpoko.ponpoko.PonPokoParty"]
+
+
+def run_session(settings,
+                summary_only=False,
+                reporter: Optional[Reporter] = None
+                ) -> Tuple[Optional[dict], dict]:
+    """
+    Runs a single negotiation session, through the geniusweb NegoRunner or
+    with the in-process FastSAOPSession if the settings ask for the "fast"
+    engine.
+
+    With summary_only the trace is not serialised and only the final action is
+    evaluated, the returned trace is None in that case. Log messages of the
+    session are buffered and only printed if the session ends in an error,
+    unless a different reporter is passed.
+
+    Optional settings: "deadline_time_ms" replaces deadline_rounds by a time
+    deadline, "parameters" holds a parameters dict for every agent and
+    "clock": "virtual" runs a fast engine session in simulated time, so agent
+    delays and the time deadline do not take wall time. Agents in
+    WALL_TIME_AGENTS can not be combined with a virtual time deadline.
+    """
+    if reporter is None:
+        reporter = BufferedReporter()
 
-def run_session(settings) -> Tuple[dict, dict]:
     agents = settings["agents"]
     profiles = settings["profiles"]
-    rounds = settings["deadline_rounds"]
+    parameters = settings.get("parameters", [{}, {}])
 
     # quick and dirty checks
     assert isinstance(agents, list) and len(agents) == 2
     assert isinstance(profiles, list) and len(profiles) == 2
-    assert isinstance(rounds, int) and rounds > 0
+    assert isinstance(parameters, list) and len(parameters) == 2
+
+    if "deadline_time_ms" in settings:
+        rounds = None
+        durationms = settings["deadline_time_ms"]
+        assert isinstance(durationms, int) and durationms > 0
+        deadline = {"DeadlineTime": {"durationms": durationms}}
+    else:
+        rounds = settings["deadline_rounds"]
+        durationms = 60000
+        assert isinstance(rounds, int) and rounds > 0
+        deadline = {
+            "DeadlineRounds": {
+                "rounds": rounds,
+                "durationms": durationms
+            }
+        }
+
+    virtual_clock = settings.get("clock") == "virtual"
+    if virtual_clock and settings.get("engine") != "fast":
+        raise ValueError("a virtual clock needs the fast engine")
+    if virtual_clock and rounds is None:
+        for agent in agents:
+            if agent in WALL_TIME_AGENTS:
+                raise ValueError(f"{agent} reads the wall time, it can not "
+                                 "run against a virtual time deadline")
 
     # file path to uri
     profiles_uri = [f"file:{x}" for x in profiles]
@@ -41,7 +109,7 @@ def run_session(settings) -> Tuple[dict, dict]:
                         "parties": [{
                             "party": {
                                 "partyref": f"pythonpath:{agents[0]}",
-                                "parameters": {},
+                                "parameters": dict(parameters[0]),
                             },
                             "profile": profiles_uri[0],
                         }]
@@ -52,19 +120,14 @@ def run_session(settings) -> Tuple[dict, dict]:
                         "parties": [{
                             "party": {
                                 "partyref": f"pythonpath:{agents[1]}",
-                                "parameters": {},
+                                "parameters": dict(parameters[1]),
                             },
                             "profile": profiles_uri[1],
                         }]
                     }
                 },
             ],
-            "deadline": {
-                "DeadlineRounds": {
-                    "rounds": rounds,
-                    "durationms": 60000
-                }
-            },
+            "deadline": deadline,
         }
     }
 
@@ -72,28 +135,63 @@ def run_session(settings) -> Tuple[dict, dict]:
     # TODO: Make this less hacky
     if "ponpoko_params" in settings and agents[0] == "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty":
         first_party = settings_full["SAOPSettings"]["participants"][0]
-        first_party["TeamInfo"]["parties"][0]["party"]["parameters"] = settings["ponpoko_params"]
+        first_party["TeamInfo"]["parties"][0]["party"]["parameters"].update(settings["ponpoko_params"])
     elif "ponpoko_params" in settings and agents[1] == "agents.ponpokoagent.ponpoko.ponpoko.PonPokoParty":
         second_party = settings_full["SAOPSettings"]["participants"][1]
-        second_party["TeamInfo"]["parties"][0]["party"]["parameters"] = settings["ponpoko_params"]
-
-    # parse settings dict to settings object
-    settings_obj = ObjectMapper().parse(settings_full, NegoSettings)
-
-    # create the negotiation session runner object
-    runner = NegoRunner(settings_obj, ClassPathConnectionFactory(),
-                        StdOutReporter(), 0)
-
-    # run the negotiation session
-    runner.run()
+        second_party["TeamInfo"]["parties"][0]["party"]["parameters"].update(settings["ponpoko_params"])
+
+    # make the random choices of the agents reproducible
+    if "seed" in settings:
+        random.seed(settings["seed"])
+
+    if settings.get("engine") == "fast":
+        parties_parameters = [
+            x["TeamInfo"]["parties"][0]["party"]["parameters"]
+            for x in settings_full["SAOPSettings"]["participants"]
+        ]
+        clock = VirtualClock() if virtual_clock else None
+        session = FastSAOPSession(agents, profiles_uri, parties_parameters,
+                                  rounds, durationms, reporter, clock)
+        session.run()
+        error = session.getError()
+
+        if summary_only:
+            results_trace = None
+            results_summary = summarise_actions(session.getActions(),
+                                                session.getAgentNames(),
+                                                session.getProfiles())
+        else:
+            results_trace, results_summary = process_actions(
+                session.getActions(),
+                session.toJson()["SAOPState"])
+    else:
+        # parse settings dict to settings object
+        settings_obj = ObjectMapper().parse(settings_full, NegoSettings)
+
+        # create the negotiation session runner object
+        runner = NegoRunner(settings_obj, ClassPathConnectionFactory(),
+                            reporter, 0)
+
+        # run the negotiation session
+        runner.run()
+
+        # get results from the session in class format and dict format
+        results_class: SAOPState = runner.getProtocol().getState()
+        error = results_class.getError()
+        if summary_only:
+            results_trace = None
+            results_summary = summarise_state(results_class)
+        else:
+            results_dict = ObjectMapper().toJson(results_class)
 
-    # get results from the session in class format and dict format
-    results_class: SAOPState = runner.getProtocol().getState()
-    results_dict = ObjectMapper().toJson(results_class)
+            # add utilities to the results and create a summary
+            results_trace, results_summary = process_results(
+                results_class, results_dict)
 
-    # add utilities to the results and create a summary
-    results_trace, results_summary = process_results(results_class,
-                                                     results_dict)
+    # a session can also fail halfway, with a trace but with an error
+    if ((error is not None or results_summary["result"] == "ERROR")
+            and isinstance(reporter, BufferedReporter)):
+        reporter.dump()
 
     return results_trace, results_summary
 
@@ -118,8 +216,77 @@ def run_tournament(tournament_settings: dict) -> Tuple[list, list]:
             print("Exiting script")
             exit()
 
-    results_summaries = []
-    tournament = []
+    # number of worker processes, sessions are run in-process if this is 1
+    workers = tournament_settings.get("workers", os.cpu_count() or 1)
+
+    tournament = list(
+        _tournament_sessions(agents, profile_sets, deadline_rounds,
+                             ponpoko_params, tournament_settings))
+
+    # sessions that finished in an earlier, interrupted run are not repeated
+    checkpoints = None
+    if "checkpoint_dir" in tournament_settings:
+        checkpoints = SessionCheckpoints(tournament_settings["checkpoint_dir"])
+
+    results_summaries: List[Optional[dict]] = [None] * len(tournament)
+    if checkpoints is not None:
+        results_summaries = [checkpoints.load(x) for x in tournament]
+    pending = [i for i, x in enumerate(results_summaries) if x is None]
+    if len(pending) < len(tournament):
+        print(f"Resuming tournament: {len(tournament) - len(pending)} of "
+              f"{len(tournament)} sessions already finished")
+
+    # optionally stream every finished session to a JSON lines file
+    results_file = tournament_settings.get("results_file")
+    sink = ResultSink(results_file) if results_file else None
+
+    try:
+        if sink is not None:
+            # the sink starts empty, so the sessions restored from their
+            # checkpoints are written again, including any that had a
+            # checkpoint but were still buffered when the last run crashed
+            for settings, results_summary in zip(tournament,
+                                                 results_summaries):
+                if results_summary is not None:
+                    sink.write(settings, results_summary)
+        sessions = [tournament[index] for index in pending]
+        quiet = tournament_settings.get("quiet", False)
+        for index, results_summary in zip(
+                pending, _run_sessions(sessions, workers, quiet)):
+            results_summaries[index] = results_summary
+            if checkpoints is not None:
+                checkpoints.store(tournament[index], results_summary)
+            if sink is not None:
+                sink.write(tournament[index], results_summary)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    return tournament, results_summaries
+
+
+def _run_sessions(tournament: List[dict], workers: int,
+                  quiet: bool) -> Iterator[dict]:
+    """Yields the summaries of the sessions in order as they finish."""
+    run = partial(_run_session_summary, quiet=quiet)
+    if workers > 1 and len(tournament) > 1:
+        # imap keeps the results in submission order, chunksize 1 hands out
+        # sessions one at a time so long sessions do not stall a whole chunk
+        with Pool(min(workers, len(tournament))) as pool:
+            yield from pool.imap(run, tournament, chunksize=1)
+    else:
+        for settings in tournament:
+            yield run(settings)
+
+
+def _tournament_sessions(agents, profile_sets, deadline_rounds, ponpoko_params,
+                         tournament_settings) -> Iterator[dict]:
+    """Yields the session settings of a tournament in a fixed order."""
+    # optional session settings that are the same for the whole tournament
+    options = {
+        k: tournament_settings[k]
+        for k in ["seed", "engine", "clock"] if k in tournament_settings
+    }
     for profiles in profile_sets:
         # quick an dirty check
         assert isinstance(profiles, list) and len(profiles) == 2
@@ -131,39 +298,52 @@ def run_tournament(tournament_settings: dict) -> Tuple[list, list]:
                 "deadline_rounds": deadline_rounds,
                 "ponpoko_params": ponpoko_params
             }
+            settings.update(options)
+            yield settings
 
-            # run a single negotiation session
-            _, results_summary = run_session(settings)
-
-            # assemble results
-            tournament.append(settings)
-            results_summaries.append(results_summary)
 
-    return tournament, results_summaries
+def _run_session_summary(settings: dict, quiet: bool) -> dict:
+    """
+    Runs a single negotiation session and only returns its summary. Quiet
+    sessions do not keep any log messages, not even for errors.
+    """
+    reporter = NullReporter() if quiet else None
+    _, results_summary = run_session(settings,
+                                     summary_only=True,
+                                     reporter=reporter)
+    return results_summary
 
 
 def process_results(results_class, results_dict):
-    results_dict = results_dict["SAOPState"]
+    return process_actions(results_class.getActions(),
+                           results_dict["SAOPState"])
 
+
+def process_actions(actions, results_dict):
+    """
+    Adds the utilities of both parties to every offer and accept of a
+    serialised SAOPState and creates a summary. The actions are the same
+    actions in class format.
+    """
     # dict to translate geniusweb agent reference to Python class name
     agent_translate = {
         k: v["party"]["partyref"].split(".")[-1]
         for k, v in results_dict["partyprofiles"].items()
     }
 
-    results_summary = {}
-
     # check if there are any actions (could have crashed)
     if results_dict["actions"]:
-        # obtain utility functions
+        # obtain compiled utility functions
         utility_funcs = {
-            k: get_utility_function(v["profile"])
+            k: get_compiled_utility_function(v["profile"])
             for k, v in results_dict["partyprofiles"].items()
         }
 
         # iterate both action classes and dict entries
-        actions_iter = zip(results_class.getActions(), results_dict["actions"])
+        actions_iter = zip(actions, results_dict["actions"])
 
+        offers = []
+        bids = []
         for num_offer, (action_class, action_dict) in enumerate(actions_iter):
             if "Offer" in action_dict:
                 offer = action_dict["Offer"]
@@ -171,55 +351,138 @@ def process_results(results_class, results_dict):
                 offer = action_dict["Accept"]
             else:
                 continue
+            offers.append(offer)
+            bids.append(action_class.getBid())
 
-            # add utility of both agents
-            bid = action_class.getBid()
-            offer["utilities"] = {
-                k: float(v.getUtility(bid))
-                for k, v in utility_funcs.items()
-            }
-
-        results_summary["num_offers"] = num_offer + 1
+        # add utility of both agents, evaluated for the whole trace at once
+        utilities = {
+            k: v.utilities(v.encode(bids)).tolist()
+            for k, v in utility_funcs.items()
+        }
+        for index, offer in enumerate(offers):
+            offer["utilities"] = {k: v[index] for k, v in utilities.items()}
 
         # gather a summary of results
+        agents = [agent_translate[actor] for actor in offer["utilities"]]
         if "Accept" in action_dict:
-            value = 0
-            for actor, utility in offer["utilities"].items():
-                value += 1
-                position = actor.split("_")[-1]
-                results_summary[f"agent_{value}"] = agent_translate[actor]
-                results_summary[f"utility_{value}"] = utility
-            util_1, util_2 = offer["utilities"].values()
-            results_summary["nash_product"] = util_1 * util_2
-            results_summary["social_welfare"] = util_1 + util_2
-            results_summary["result"] = "agreement"
+            results_summary = _summary(num_offer + 1, agents,
+                                       list(offer["utilities"].values()))
         else:
-            value = 0
-            for actor, utility in offer["utilities"].items():
-                position = actor.split("_")[-1]
-                value += 1
-                results_summary[f"agent_{value}"] = agent_translate[actor]
-                results_summary[f"utility_{value}"] = 0
-            results_summary["nash_product"] = 0
-            results_summary["social_welfare"] = 0
-            results_summary["result"] = "failed"
+            results_summary = _summary(num_offer + 1, agents, None)
     else:
         # something crashed crashed
-        for actor in results_dict["connections"]:
-            position = actor.split("_")[-1]
-            results_summary[f"agent_{position}"] = agent_translate[actor]
-            results_summary[f"utility_{position}"] = 0
+        results_summary = _error_summary(agent_translate)
+
+    return results_dict, results_summary
+
+
+def summarise_state(results_class: SAOPState) -> dict:
+    """
+    Builds the same summary as process_results from the final action only,
+    without serialising the session or computing utilities for every action.
+    """
+    # Python class name and profile of every party, in participant order
+    agent_translate = {}
+    profiles = {}
+    for party, party_profile in results_class.getPartyProfiles().items():
+        actor = party.getName()
+        partyref = str(party_profile.getParty().getPartyRef().getURI())
+        agent_translate[actor] = partyref.split(".")[-1]
+        profiles[actor] = str(party_profile.getProfile().getURI())
+
+    return summarise_actions(results_class.getActions(), agent_translate,
+                             profiles)
+
+
+def summarise_actions(actions, agent_translate: Dict[str, str],
+                      profiles: Dict[str, str]) -> dict:
+    """
+    @param actions the actions of a session in class format
+    @param agent_translate the Python class name of every party
+    @param profiles the profile URI of every party
+    @return the summary of the session, based on its final action only
+    """
+    if not actions:
+        # something crashed crashed
+        return _error_summary(agent_translate)
+
+    agents = list(agent_translate.values())
+    final_action = actions[-1]
+    if not isinstance(final_action, Accept):
+        return _summary(len(actions), agents, None)
+
+    bid = final_action.getBid()
+    utilities = [
+        get_compiled_utility_function(profile).utility(bid)
+        for profile in profiles.values()
+    ]
+    return _summary(len(actions), agents, utilities)
+
+
+def _summary(num_offers: int, agents: List[str],
+             utilities: Optional[List[float]]) -> dict:
+    """
+    Summary of a session that ended with an agreement with the given
+    utilities, or without agreement if utilities is None.
+    """
+    results_summary = {"num_offers": num_offers}
+    for value, agent in enumerate(agents, 1):
+        results_summary[f"agent_{value}"] = agent
+        results_summary[f"utility_{value}"] = 0
+        if utilities is not None:
+            results_summary[f"utility_{value}"] = utilities[value - 1]
+    if utilities is not None:
+        util_1, util_2 = utilities
+        results_summary["nash_product"] = util_1 * util_2
+        results_summary["social_welfare"] = util_1 + util_2
+        results_summary["result"] = "agreement"
+    else:
         results_summary["nash_product"] = 0
         results_summary["social_welfare"] = 0
-        results_summary["result"] = "ERROR"
+        results_summary["result"] = "failed"
+    return results_summary
 
-    return results_dict, results_summary
+
+def _error_summary(agent_translate: Dict[str, str]) -> dict:
+    """Summary of a session that crashed before any action was done."""
+    results_summary = {}
+    for actor, agent in agent_translate.items():
+        position = actor.split("_")[-1]
+        results_summary[f"agent_{position}"] = agent
+        results_summary[f"utility_{position}"] = 0
+    results_summary["nash_product"] = 0
+    results_summary["social_welfare"] = 0
+    results_summary["result"] = "ERROR"
+    return results_summary
 
 
 def get_utility_function(profile_uri) -> LinearAdditiveUtilitySpace:
+    return _utility_functions.get(profile_uri)
+
+
+def get_compiled_utility_function(profile_uri) -> CompiledUtilitySpace:
+    return _compiled_utility_functions.get(profile_uri)
+
+
+def utility_function_cache_info() -> dict:
+    """Hit and miss counters of the parsed utility space cache."""
+    return _utility_functions.info()
+
+
+def _load_utility_function(profile_uri) -> LinearAdditiveUtilitySpace:
     profile_connection = ProfileConnectionFactory.create(
         URI(profile_uri), StdOutReporter())
     profile = profile_connection.getProfile()
+    profile_connection.close()
     assert isinstance(profile, LinearAdditiveUtilitySpace)
 
     return profile
+
+
+def _compile_utility_function(profile_uri) -> CompiledUtilitySpace:
+    return CompiledUtilitySpace(get_utility_function(profile_uri))
+
+
+# parsed utility spaces, shared by all sessions that run in this process
+_utility_functions = ProfileCache(_load_utility_function)
+_compiled_utility_functions = ProfileCache(_compile_utility_function)
@@ -1,6 +1,9 @@
 import logging
 import sys
+from collections import deque
+from typing import Deque
 from typing import Optional
+from typing import Tuple
 
 from tudelft_utilities_logging.Reporter import Reporter
 
@@ -12,3 +15,35 @@ class StdOutReporter(Reporter):
             print(logging.getLevelName(level) + ":" + msg, file=sys.stderr)
         else:
             print(logging.getLevelName(level) + ":" + msg)
+
+
+class BufferedReporter(Reporter):
+    """
+    Keeps the last messages of at least the given level in memory instead of
+    printing them. The buffer is only written out with dump, which the
+    runners do when a session ends in an error.
+    """
+
+    def __init__(self, level: int = logging.INFO, capacity: int = 1000):
+        self._level = level
+        self._buffer: Deque[Tuple[int, str, Optional[BaseException]]] = \
+            deque(maxlen=capacity)
+
+    def log(self, level: int, msg: str, exc: Optional[BaseException] = None):
+        if level >= self._level:
+            self._buffer.append((level, msg, exc))
+
+    def dump(self, file=sys.stderr):
+        for level, msg, exc in self._buffer:
+            line = logging.getLevelName(level) + ":" + msg
+            if exc is not None:
+                line += f" ({exc!r})"
+            print(line, file=file)
+        self._buffer.clear()
+
+
+class NullReporter(Reporter):
+    """Drops every message, for benchmark runs."""
+
+    def log(self, level: int, msg: str, exc: Optional[BaseException] = None):
+        pass
@@ -0,0 +1,172 @@
+import json
+from typing import Any
+from typing import Dict
+from typing import List
+
+import numpy as np
+
+# actions that are stored in the columns, anything else is kept verbatim
+_COLUMN_ACTIONS = ["Offer", "Accept"]
+
+
+def write_trace(results_trace: dict, trace_file: str):
+    """Writes a results trace to a compressed columnar .npz file."""
+    np.savez_compressed(trace_file, **trace_to_columns(results_trace))
+
+
+def read_trace(trace_file: str) -> dict:
+    """Reads a file written by write_trace back into the JSON trace layout."""
+    with np.load(trace_file, allow_pickle=False) as data:
+        return columns_to_trace({key: data[key] for key in data.files})
+
+
+def trace_to_columns(results_trace: dict) -> Dict[str, np.ndarray]:
+    """
+    Converts a results trace as returned by run_session into columnar arrays.
+
+    Every action becomes a row with its round, actor index, action type
+    index, the value index of every issue of its bid and the utility for
+    every party. Issue, value, actor and party names are stored once in a
+    JSON header, together with the rest of the trace. Actions that do not fit
+    the columns are kept verbatim in the header, so the conversion is lossless.
+    """
+    actions = results_trace["actions"]
+    state = {k: v for k, v in results_trace.items() if k != "actions"}
+
+    actors: List[str] = []
+    issues: List[str] = []
+    values: Dict[str, List[Any]] = {}
+    # index of every value, keyed by its JSON encoding since 1 and "1" or 1
+    # and 1.0 are different values in the JSON layout
+    value_index: Dict[str, Dict[str, int]] = {}
+    parties = list(results_trace.get("partyprofiles", {}))
+
+    # collect the names first, so the columns can be allocated at once
+    for action in actions:
+        body = _column_body(action, parties)
+        if body is None:
+            continue
+        if body["actor"] not in actors:
+            actors.append(body["actor"])
+        if body["bid"] is None:
+            continue
+        for issue, value in body["bid"]["issuevalues"].items():
+            if issue not in values:
+                issues.append(issue)
+                values[issue] = []
+                value_index[issue] = {}
+            if json.dumps(value) not in value_index[issue]:
+                value_index[issue][json.dumps(value)] = len(values[issue])
+                values[issue].append(value)
+
+    size = len(actions)
+    action_type = np.full(size, -1, dtype=np.int8)
+    actor = np.full(size, -1, dtype=np.int16)
+    bids = np.full((size, len(issues)), -1, dtype=np.int32)
+    has_bid = np.zeros(size, dtype=bool)
+    utilities = np.full((size, len(parties)), np.nan, dtype=np.float64)
+    has_utilities = np.zeros(size, dtype=bool)
+    extra = {}
+
+    for row, action in enumerate(actions):
+        body = _column_body(action, parties)
+        if body is None:
+            extra[str(row)] = action
+            continue
+        action_type[row] = _COLUMN_ACTIONS.index(next(iter(action)))
+        actor[row] = actors.index(body["actor"])
+        if body["bid"] is not None:
+            has_bid[row] = True
+            for issue, value in body["bid"]["issuevalues"].items():
+                bids[row, issues.index(issue)] = \
+                    value_index[issue][json.dumps(value)]
+        if "utilities" in body:
+            has_utilities[row] = True
+            utilities[row] = list(body["utilities"].values())
+
+    header = {
+        "action_types": _COLUMN_ACTIONS,
+        "actors": actors,
+        "issues": issues,
+        "values": values,
+        "parties": parties,
+        "extra": extra,
+        "state": state,
+        "keys": list(results_trace),
+    }
+    return {
+        "header": np.array(json.dumps(header)),
+        "round": np.arange(size, dtype=np.int32) // max(len(parties), 1),
+        "action_type": action_type,
+        "actor": actor,
+        "bids": bids,
+        "has_bid": has_bid,
+        "utilities": utilities,
+        "has_utilities": has_utilities,
+    }
+
+
+def columns_to_trace(columns: Dict[str, np.ndarray]) -> dict:
+    """Converts the output of trace_to_columns back into a results trace."""
+    header = json.loads(str(columns["header"]))
+    issues = header["issues"]
+    values = header["values"]
+    parties = header["parties"]
+
+    actions = []
+    for row in range(len(columns["action_type"])):
+        if str(row) in header["extra"]:
+            actions.append(header["extra"][str(row)])
+            continue
+
+        body: Dict[str, Any] = {
+            "actor": header["actors"][columns["actor"][row]],
+            "bid": None
+        }
+        if columns["has_bid"][row]:
+            body["bid"] = {
+                "issuevalues": {
+                    issue: values[issue][index]
+                    for issue, index in zip(issues, columns["bids"][row])
+                    if index >= 0
+                }
+            }
+        if columns["has_utilities"][row]:
+            body["utilities"] = {
+                party: float(utility)
+                for party, utility in zip(parties, columns["utilities"][row])
+            }
+        action_type = header["action_types"][columns["action_type"][row]]
+        actions.append({action_type: body})
+
+    state = {"actions": actions, **header["state"]}
+    return {key: state[key] for key in header["keys"]}
+
+
+def _column_body(action: dict, parties: List[str]):
+    """The body of an action if it can be stored in the columns, else None."""
+    if len(action) != 1 or next(iter(action)) not in _COLUMN_ACTIONS:
+        return None
+    body = next(iter(action.values()))
+    if not {"actor", "bid"} <= set(body) <= {"actor", "bid", "utilities"}:
+        return None
+    bid = body["bid"]
+    if bid is not None and (set(bid) != {"issuevalues"}
+                            or not isinstance(bid["issuevalues"], dict)):
+        return None
+    if "utilities" in body and list(body["utilities"]) != parties:
+        return None
+    return body
+
+
+if __name__ == "__main__":
+    # convert between the JSON and the columnar layout, based on extension
+    import sys
+
+    source, destination = sys.argv[1:3]
+    if source.endswith(".npz"):
+        with open(destination, "w") as f:
+            f.write(json.dumps(read_trace(source), indent=2))
+    else:
+        with open(source) as f:
+            write_trace(json.load(f), destination)